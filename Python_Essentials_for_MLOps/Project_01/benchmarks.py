@@ -0,0 +1,355 @@
+"""
+Benchmarks do Sistema de Recomendação de Filmes
+
+Este script mede o desempenho do módulo movie_recommendations e imprime
+os resultados em JSON.
+
+Benchmarks disponíveis:
+- startup: tempo de importação do módulo em um processo Python novo.
+- typeahead: latência (p50/p99) da pesquisa incremental, digitando títulos
+  reais caractere a caractere (usa os dados em OUTPUT_DIRECTORY).
+- ingest: reprodução de lotes de avaliações novas, comparando add_ratings
+  com a reconstrução completa da matriz de avaliações.
+- stages: tempo, pico de memória e vazão de load_data, vectorized_data,
+  search e find_similar_movies sobre dados sintéticos (synthetic_movielens)
+  na escala escolhida. O resultado pode ser salvo como linha de base (--output)
+  e comparado com uma linha de base anterior (--baseline).
+
+Exemplo de Uso:
+---------------
+python benchmarks.py startup --repeats 10
+python benchmarks.py typeahead --repeats 500
+python benchmarks.py ingest --repeats 20
+python benchmarks.py stages --ratings 1000000 --output baseline.json
+python benchmarks.py stages --ratings 1000000 --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Diretório onde está o módulo movie_recommendations
+MODULE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+def benchmark_startup(repeats=5):
+    """
+    Mede o tempo de importação de movie_recommendations em processos novos.
+
+    Cada importação roda em um diretório temporário vazio, o que também
+    permite verificar que nenhum arquivo ou diretório é criado.
+
+    Args:
+        repeats (int): Número de processos medidos.
+
+    Returns:
+        dict: Mediana e mínimo do tempo de importação, em segundos.
+    """
+    code = ("import time; start = time.perf_counter(); import movie_recommendations; "
+            "print(time.perf_counter() - start)")
+    env = dict(os.environ, PYTHONPATH=MODULE_DIRECTORY)
+    timings = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as working_directory:
+            result = subprocess.run([sys.executable, "-c", code], cwd=working_directory,
+                                    env=env, capture_output=True, text=True, check=True)
+            timings.append(float(result.stdout))
+            side_effects = os.listdir(working_directory)
+    return {
+        "stage": "startup",
+        "repeats": repeats,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "created_files": side_effects,
+    }
+
+def benchmark_typeahead(recommender=None, repeats=200, seed=0):
+    """
+    Mede a latência da pesquisa incremental simulando usuários digitando títulos.
+
+    Args:
+        recommender (MovieRecommender): O recomendador (padrão: o do módulo).
+        repeats (int): Número de títulos digitados.
+        seed (int): Semente da amostragem dos títulos.
+
+    Returns:
+        dict: Percentis de latência por tecla, em milissegundos.
+    """
+    import movie_recommendations  # pylint: disable=import-outside-toplevel
+
+    recommender = recommender if recommender is not None else movie_recommendations.get_recommender()
+    index = recommender.typeahead_index
+    titles = random.Random(seed).choices(list(recommender.dataset.movies["title"]), k=repeats)
+
+    latencies = []
+    for title in titles:
+        session = movie_recommendations.TypeaheadSession(index)
+        for end in range(1, len(title) + 1):
+            start = time.perf_counter()
+            session.search(title[:end])
+            latencies.append(time.perf_counter() - start)
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "stage": "typeahead",
+        "keystrokes": int(latencies.shape[0]),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+    }
+
+def benchmark_ingest(ratings=None, repeats=10, batch_size=10_000, movie_id=None):
+    """
+    Reproduz as últimas avaliações em lotes, com e sem ingestão incremental.
+
+    As avaliações finais são separadas em `repeats` lotes. Para cada lote, a
+    ingestão incremental chama RatingsMatrix.add_ratings e a reconstrução
+    completa cria uma nova RatingsMatrix com todas as avaliações até ali; em
+    ambos os casos, uma recomendação é calculada em seguida.
+
+    Args:
+        ratings (pd.DataFrame): As avaliações (padrão: as do recomendador do módulo).
+        repeats (int): Número de lotes reproduzidos.
+        batch_size (int): Número de avaliações por lote.
+        movie_id (int): Filme consultado após cada lote (padrão: o mais avaliado).
+
+    Returns:
+        dict: Tempo médio por lote de cada estratégia, em segundos, e o ganho.
+    """
+    import movie_recommendations  # pylint: disable=import-outside-toplevel
+
+    if ratings is None:
+        ratings = movie_recommendations.get_recommender().dataset.ratings
+    if movie_id is None:
+        movie_id = int(ratings["movieId"].value_counts().idxmax())
+    split = max(len(ratings) - repeats * batch_size, 1)
+    base = ratings.iloc[:split]
+    batches = [ratings.iloc[start:start + batch_size]
+               for start in range(split, len(ratings), batch_size)]
+
+    matrix = movie_recommendations.RatingsMatrix(base)
+    incremental = []
+    for batch in batches:
+        start = time.perf_counter()
+        matrix.add_ratings(batch)
+        matrix.similar_scores(movie_id)
+        incremental.append(time.perf_counter() - start)
+
+    rebuild = []
+    for end in range(1, len(batches) + 1):
+        start = time.perf_counter()
+        movie_recommendations.RatingsMatrix(ratings.iloc[:split + end * batch_size]) \
+            .similar_scores(movie_id)
+        rebuild.append(time.perf_counter() - start)
+
+    return {
+        "stage": "ingest",
+        "batches": len(batches),
+        "batch_size": batch_size,
+        "incremental_mean_s": statistics.mean(incremental),
+        "rebuild_mean_s": statistics.mean(rebuild),
+        "speedup": statistics.mean(rebuild) / statistics.mean(incremental),
+    }
+
+def measure(function, repeats=3, setup=None):
+    """
+    Mede o tempo de parede e o pico de memória de uma função.
+
+    O tempo é o melhor de `repeats` execuções sem rastreamento de memória; o
+    pico vem de uma execução adicional com tracemalloc (que inclui as alocações
+    do numpy e do pandas).
+
+    Args:
+        function (callable): A função medida.
+        repeats (int): Número de execuções cronometradas.
+        setup (callable): Chamada antes de cada execução, fora da medição.
+
+    Returns:
+        dict: wall_s (segundos) e peak_mb (MiB).
+    """
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"wall_s": min(timings), "peak_mb": peak / 2 ** 20}
+
+def git_commit():
+    """
+    Retorna o commit atual do repositório, se disponível.
+
+    Returns:
+        str: O hash do commit ou None.
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=MODULE_DIRECTORY,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def benchmark_stages(n_ratings=100_000, repeats=3, queries=200, seed=0):
+    """
+    Mede cada etapa do recomendador sobre dados sintéticos gerados na hora.
+
+    Etapas medidas:
+    - load_data_cold: leitura dos CSVs e conversão das avaliações para o cache colunar.
+    - load_data: leitura a partir do cache colunar.
+    - vectorized_data: ajuste do índice TF-IDF dos títulos.
+    - ratings_matrix: construção da matriz esparsa de avaliações.
+    - search: `queries` pesquisas por título distintas, com o cache de resultados vazio.
+    - find_similar_movies: `queries` recomendações distintas, com o cache vazio.
+
+    Args:
+        n_ratings (int): Número de avaliações sintéticas (de 100 mil a 25 milhões).
+        repeats (int): Número de execuções cronometradas por etapa.
+        queries (int): Número de consultas das etapas search e find_similar_movies.
+        seed (int): Semente dos dados e das consultas.
+
+    Returns:
+        dict: Tamanho dos dados, ambiente e, para cada etapa, wall_s, peak_mb e throughput.
+    """
+    # pylint: disable=import-outside-toplevel
+    import movie_recommendations
+    from synthetic_movielens import write_movielens
+
+    with tempfile.TemporaryDirectory() as directory:
+        data = write_movielens(directory, n_ratings=n_ratings, seed=seed)
+        movies = data["movies"]
+        n_movies = len(movies)
+        del data
+
+        cache_directory = movie_recommendations.ratings_cache_directory(directory)
+        csv_files = movie_recommendations.CSV_FILES
+        stages = {
+            "load_data_cold": (measure(
+                lambda: movie_recommendations.load_data(csv_files, directory), repeats,
+                setup=lambda: shutil.rmtree(cache_directory, ignore_errors=True)), n_ratings),
+            "load_data": (measure(
+                lambda: movie_recommendations.load_data(csv_files, directory), repeats),
+                n_ratings),
+        }
+
+        recommender = movie_recommendations.MovieRecommender(
+            movie_recommendations.MovieLensDataset(output_directory=directory))
+        titles = recommender.dataset.movies["clean_title"]
+        index = movie_recommendations.TitleIndex(os.path.join(directory, "title_index_benchmark"))
+        stages["vectorized_data"] = (measure(lambda: index.fit(titles), repeats), n_movies)
+        stages["ratings_matrix"] = (measure(
+            lambda: movie_recommendations.RatingsMatrix(recommender.dataset.ratings), repeats),
+            n_ratings)
+
+        sample = random.Random(seed).sample(range(n_movies), min(queries, n_movies))
+        query_titles = movies["title"].iloc[sample].str.slice(0, 12).tolist()
+        query_ids = movies["movieId"].iloc[sample].tolist()
+        _ = recommender.title_index, recommender.ratings_matrix
+        stages["search"] = (measure(
+            lambda: [recommender.search(title) for title in query_titles], repeats,
+            setup=recommender.search_cache.invalidate), len(query_titles))
+        stages["find_similar_movies"] = (measure(
+            lambda: [recommender.find_similar_movies(movie_id) for movie_id in query_ids],
+            repeats, setup=recommender.similar_cache.invalidate), len(query_ids))
+
+    return {
+        "benchmark": "stages",
+        "n_ratings": n_ratings,
+        "n_movies": n_movies,
+        "repeats": repeats,
+        "environment": {"commit": git_commit(), "python": platform.python_version(),
+                        "numpy": np.__version__, "pandas": pd.__version__},
+        "stages": {name: dict(result, throughput=count / result["wall_s"])
+                   for name, (result, count) in stages.items()},
+    }
+
+def compare_to_baseline(results, baseline, tolerance=0.10):
+    """
+    Compara um resultado de benchmark_stages com uma linha de base.
+
+    Uma etapa regride quando o tempo ou o pico de memória fica mais de
+    `tolerance` acima da linha de base.
+
+    Args:
+        results (dict): O resultado atual.
+        baseline (dict): A linha de base.
+        tolerance (float): Aumento relativo tolerado.
+
+    Returns:
+        list: Para cada etapa e métrica, os valores, a razão atual/base e se houve regressão.
+    """
+    if results["n_ratings"] != baseline["n_ratings"]:
+        raise ValueError("A linha de base foi medida em outra escala "
+                         f"({baseline['n_ratings']} avaliações).")
+    comparison = []
+    for stage, current in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous is None:
+            continue
+        for metric in ("wall_s", "peak_mb"):
+            ratio = current[metric] / previous[metric] if previous[metric] else float("inf")
+            comparison.append({"stage": stage, "metric": metric, "baseline": previous[metric],
+                               "current": current[metric], "ratio": ratio,
+                               "regression": ratio > 1 + tolerance})
+    return comparison
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema de recomendação.")
+    parser.add_argument("benchmark", choices=["startup", "typeahead", "ingest", "stages"],
+                        help="Benchmark a executar.")
+    parser.add_argument("--repeats", type=int, default=5, help="Número de repetições.")
+    parser.add_argument("--ratings", type=int, default=100_000,
+                        help="stages: número de avaliações sintéticas.")
+    parser.add_argument("--output", help="stages: grava o resultado como linha de base.")
+    parser.add_argument("--baseline", help="stages: linha de base a comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="stages: aumento relativo tolerado antes de acusar regressão.")
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "startup":
+        print(json.dumps(benchmark_startup(repeats=args.repeats), indent=2))
+    elif args.benchmark == "typeahead":
+        print(json.dumps(benchmark_typeahead(repeats=args.repeats), indent=2))
+    elif args.benchmark == "ingest":
+        print(json.dumps(benchmark_ingest(repeats=args.repeats), indent=2))
+    elif args.benchmark == "stages":
+        results = benchmark_stages(n_ratings=args.ratings, repeats=args.repeats)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output_file:
+                json.dump(results, output_file, indent=2)
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as baseline_file:
+                comparison = compare_to_baseline(results, json.load(baseline_file),
+                                                 tolerance=args.tolerance)
+            print(json.dumps(comparison, indent=2))
+            if any(row["regression"] for row in comparison):
+                sys.exit(1)
+        else:
+            print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Teste de Carga do Serviço de Recomendação
+
+Este script dispara requisições concorrentes contra uma instância do
+recommendation_service e imprime, em JSON, a vazão (QPS), os percentis de
+latência e a contagem de respostas por código HTTP.
+
+Exemplo de Uso:
+---------------
+# Contra um serviço já em execução
+python load_test.py --url http://127.0.0.1:8080 --concurrency 64 --requests 5000
+
+# Iniciando uma instância local antes do teste
+python load_test.py --start-server --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote
+
+import aiohttp
+import numpy as np
+
+# Diretório onde está o módulo recommendation_service
+MODULE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Consultas usadas por padrão (títulos e movieIds populares do MovieLens 25M)
+DEFAULT_TITLES = ["Toy Story", "Matrix", "Star Wars", "Pulp Fiction", "Forrest Gump",
+                  "Jurassic Park", "Godfather", "Titanic", "Fight Club", "Inception"]
+DEFAULT_MOVIE_IDS = [1, 2, 32, 50, 260, 296, 318, 356, 480, 593, 1196, 2571, 2959]
+
+def build_requests(total, similar_share=0.5, titles=None, movie_ids=None, seed=0):
+    """
+    Sorteia a sequência de caminhos requisitados.
+
+    Args:
+        total (int): Número de requisições.
+        similar_share (float): Fração das requisições feitas a /similar.
+        titles (list): Títulos pesquisados em /search.
+        movie_ids (list): movieIds consultados em /similar.
+        seed (int): Semente do sorteio.
+
+    Returns:
+        list: Pares (endpoint, caminho).
+    """
+    rng = random.Random(seed)
+    titles = titles or DEFAULT_TITLES
+    movie_ids = movie_ids or DEFAULT_MOVIE_IDS
+    paths = []
+    for _ in range(total):
+        if rng.random() < similar_share:
+            paths.append(("similar", f"/similar/{rng.choice(movie_ids)}"))
+        else:
+            paths.append(("search", f"/search?q={quote(rng.choice(titles))}"))
+    return paths
+
+def percentiles(latencies):
+    """
+    Resume uma lista de latências.
+
+    Args:
+        latencies (list): Latências em segundos.
+
+    Returns:
+        dict: p50, p90, p99 e máximo, em milissegundos.
+    """
+    if not latencies:
+        return {}
+    latencies = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p90_ms": float(np.percentile(latencies, 90)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+    }
+
+async def run_load(url, paths, concurrency=32):
+    """
+    Executa as requisições com um número fixo de clientes concorrentes.
+
+    Args:
+        url (str): O endereço base do serviço.
+        paths (list): Pares (endpoint, caminho) a requisitar.
+        concurrency (int): Número de requisições simultâneas.
+
+    Returns:
+        dict: QPS, percentis de latência (geral e por endpoint) e códigos HTTP.
+    """
+    queue = asyncio.Queue()
+    for item in paths:
+        queue.put_nowait(item)
+    latencies = {"search": [], "similar": []}
+    statuses = Counter()
+
+    async def client(session):
+        while not queue.empty():
+            endpoint, path = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                async with session.get(url + path) as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except aiohttp.ClientError:
+                statuses["error"] += 1
+                continue
+            latencies[endpoint].append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    all_latencies = latencies["search"] + latencies["similar"]
+    return {
+        "requests": len(paths),
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "qps": len(paths) / elapsed,
+        "latency": percentiles(all_latencies),
+        "search": percentiles(latencies["search"]),
+        "similar": percentiles(latencies["similar"]),
+        "status": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+async def wait_until_ready(url, timeout=600):
+    """
+    Aguarda o serviço responder em /health.
+
+    Args:
+        url (str): O endereço base do serviço.
+        timeout (float): Tempo máximo de espera, em segundos.
+    """
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url + "/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"O serviço em {url} não respondeu em {timeout} s.")
+            await asyncio.sleep(0.5)
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço de recomendação.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="Endereço do serviço.")
+    parser.add_argument("--requests", type=int, default=2000, help="Número de requisições.")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Número de requisições simultâneas.")
+    parser.add_argument("--similar-share", type=float, default=0.5,
+                        help="Fração das requisições feitas a /similar.")
+    parser.add_argument("--start-server", action="store_true",
+                        help="Inicia uma instância local do serviço antes do teste.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads de cálculo da instância iniciada com --start-server.")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start_server:
+        port = args.url.rsplit(":", maxsplit=1)[-1].strip("/")
+        command = [sys.executable, os.path.join(MODULE_DIRECTORY, "recommendation_service.py"),
+                   "--port", port]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command)  # pylint: disable=consider-using-with
+    try:
+        if server is not None:
+            asyncio.run(wait_until_ready(args.url))
+        paths = build_requests(args.requests, similar_share=args.similar_share)
+        print(json.dumps(asyncio.run(run_load(args.url, paths, args.concurrency)), indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -16,10 +16,15 @@ Funcionalidades:
 
 Exemplo de Uso:
 ---------------
-# Importe e execute a função de recomendação com base no título "Toy Story".
-from movie_recommendation import on_type_recommendation
+# Importar o módulo não baixa nem carrega nada; os dados são carregados
+# sob demanda na primeira pesquisa ou recomendação.
+from movie_recommendations import on_type_recommendation
 
-on_type_recommendation()
+on_type_recommendation("Toy Story")
+
+# Ou, pela linha de comando:
+#   python movie_recommendations.py "Toy Story"
+#   python movie_recommendations.py --precompute
 
 Dependências:
 - numpy
@@ -28,8 +33,8 @@ Dependências:
 - scikit-learn (sklearn)
 
 Arquivo de Log:
-O módulo gera um arquivo de log ("recommendation.log") para registrar informações de 
-execução e erros.
+Ao ser executado como script, o módulo gera um arquivo de log ("recommendation.log")
+para registrar informações de execução e erros.
 
 Nota:
 Certifique-se de que os dados do conjunto de dados MovieLens (ml-25m)
@@ -41,38 +46,74 @@ Autor:
 
 """
 
+import argparse
+import bisect
+import contextlib
+import hashlib
 import zipfile
 import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import json
 import logging
 import re
-import requests
+from collections import OrderedDict
 import pandas as pd
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] - %(message)s")
 
-# Configuração do logging
+# Configuração do logging (aplicada apenas pelo ponto de entrada, ver configure_logging)
 LOG_FILE = 'recommendation.log'
-log_handler = logging.FileHandler(LOG_FILE)
-log_handler.setFormatter(log_formatter)
-logger = logging.getLogger()
-logger.addHandler(log_handler)
-logger.setLevel(logging.INFO)
 
 
 # URL do arquivo ZIP
 ZIP_URL = "https://files.grouplens.org/datasets/movielens/ml-25m.zip"
 
 # Nome dos arquivos CSV que você deseja extrair
-csv_files = ["movies.csv", "ratings.csv"]
+CSV_FILES = ["movies.csv", "ratings.csv"]
+csv_files = CSV_FILES
+
+# URL do checksum MD5 publicado para o arquivo ZIP
+ZIP_MD5_URL = ZIP_URL + ".md5"
+
+# Tamanho dos blocos do download em streaming (1 MiB)
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Número de consultas comparadas por bloco na pesquisa em lote
+QUERY_CHUNK_SIZE = 256
+
+# Número de consultas recentes guardadas no LRU da pesquisa incremental
+TYPEAHEAD_CACHE_SIZE = 1024
+
+# Número de interações acrescentadas por add_ratings que dispara a fusão com a matriz principal
+INGEST_COMPACT_THRESHOLD = 1_000_000
+
+# Tamanho máximo e tempo de vida (segundos) do cache de resultados de search/find_similar_movies
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_TTL = 3600
 
 # Diretório onde você deseja salvar os arquivos CSV extraídos
 OUTPUT_DIRECTORY = "./movielens_data/"
 
-vectorizer = TfidfVectorizer(ngram_range=(1,2))
+
+def configure_logging(log_file=LOG_FILE):
+    """
+    Configura o logger raiz para gravar no arquivo de log.
+
+    Chamada pelo ponto de entrada do script; importar o módulo não cria o arquivo.
+
+    Args:
+        log_file (str): O caminho do arquivo de log.
+    """
+    logger = logging.getLogger()
+    log_path = os.path.abspath(log_file)
+    if any(getattr(handler, "baseFilename", None) == log_path for handler in logger.handlers):
+        return
+    log_handler = logging.FileHandler(log_file)
+    log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] - %(message)s"))
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
 
 # Função para fazer o download e extrair os arquivos CSV
 def create_output_directory(output_directory):
@@ -98,65 +139,415 @@ def create_output_directory(output_directory):
         logging.error("Erro ao criar o diretório de saída: %s",err)
         return False
 
+def fetch_expected_md5(checksum_url):
+    """
+    Obtém o checksum MD5 publicado para o arquivo ZIP.
+
+    Args:
+        checksum_url (str): A URL do arquivo .md5.
+
+    Returns:
+        str: O MD5 em hexadecimal ou None se não for possível obtê-lo.
+    """
+    import requests  # pylint: disable=import-outside-toplevel
+
+    try:
+        response = requests.get(checksum_url, timeout=10)
+        response.raise_for_status()
+        return response.text.split()[0].lower()
+    except (requests.exceptions.RequestException, IndexError) as err:
+        logging.warning("Não foi possível obter o checksum do arquivo ZIP: %s", err)
+        return None
+
+def file_md5(file_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Calcula o MD5 de um arquivo lendo-o em blocos.
+
+    Args:
+        file_path (str): O caminho do arquivo.
+        chunk_size (int): Tamanho dos blocos lidos.
+
+    Returns:
+        str: O MD5 em hexadecimal.
+    """
+    digest = hashlib.md5()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _stream_to_part_file(response, part_path, chunk_size):
+    """
+    Grava a resposta HTTP no arquivo parcial, continuando-o se a resposta for parcial (206).
+
+    Args:
+        response (requests.Response): A resposta em modo stream.
+        part_path (str): O caminho do arquivo parcial.
+        chunk_size (int): Tamanho dos blocos gravados.
+
+    Returns:
+        tuple: (bytes recebidos nesta resposta, tamanho total esperado ou None).
+    """
+    if response.status_code == 206:
+        # Content-Range: bytes início-fim/total
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        mode = "ab"
+    else:
+        # O servidor ignorou o Range: o download recomeça do zero
+        response.raise_for_status()
+        total = response.headers.get("Content-Length")
+        mode = "wb"
+    total = int(total) if total and total.isdigit() else None
+
+    received = 0
+    with open(part_path, mode) as part_file:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            part_file.write(chunk)
+            received += len(chunk)
+    return received, total
+
 # Função para fazer o download do arquivo ZIP
-def download_zip(zip_url, output_directory):
+def download_zip(zip_url, output_directory, expected_md5=None, checksum_url=None,
+                 chunk_size=DOWNLOAD_CHUNK_SIZE, retries=3):
     """
     Faz o download do arquivo ZIP se ele não existir no diretório de saída.
 
+    O download é feito em blocos de tamanho fixo para um arquivo ".part",
+    com memória limitada. Se for interrompido, é retomado com um cabeçalho
+    HTTP Range (na mesma chamada, até `retries` vezes, ou na próxima). O
+    arquivo só recebe o nome final depois de o tamanho e, quando conhecido,
+    o MD5 serem verificados.
+
     Args:
         zip_url (str): A URL do arquivo ZIP a ser baixado.
         output_directory (str): O caminho para o diretório de saída.
+        expected_md5 (str): MD5 esperado do arquivo.
+        checksum_url (str): URL do arquivo .md5, usada se expected_md5 não for informado.
+        chunk_size (int): Tamanho dos blocos gravados.
+        retries (int): Número de tentativas de retomada após uma interrupção.
 
     Returns:
         bool: True se o download foi bem-sucedido ou o arquivo já existe, False em caso de erro.
     """
     zip_file_path = os.path.join(output_directory, "movielens_data.zip")
+    part_path = zip_file_path + ".part"
 
     # Verifica se o arquivo ZIP já existe no diretório de saída
     if os.path.exists(zip_file_path):
         logging.info("O arquivo ZIP já existe. Não é necessário fazer o download novamente.")
         return True
 
-    try:
-        response = requests.get(zip_url,timeout=10)
-        with open(zip_file_path, "wb") as zip_file:
-            zip_file.write(response.content)
-        logging.info("Download do arquivo ZIP concluído com sucesso.")
-        return True
+    import requests  # pylint: disable=import-outside-toplevel
+
+    if expected_md5 is None and checksum_url is not None:
+        expected_md5 = fetch_expected_md5(checksum_url)
+
+    start = time.perf_counter()
+    downloaded = 0
+    total = None
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if total is not None and offset >= total:
+            break
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with requests.get(zip_url, headers=headers, stream=True, timeout=10) as response:
+                if response.status_code == 416:
+                    # O arquivo parcial já contém todos os bytes
+                    break
+                received, total = _stream_to_part_file(response, part_path, chunk_size)
+                downloaded += received
+            if total is None or os.path.getsize(part_path) >= total:
+                break
+            logging.warning("Download interrompido em %s de %s bytes.",
+                            os.path.getsize(part_path), total)
+        except (requests.exceptions.RequestException, OSError) as err:
+            logging.warning("Erro no download (tentativa %s): %s", attempt + 1, err)
+    else:
+        logging.error("Erro ao fazer o download do arquivo ZIP: tentativas esgotadas.")
+        return False
 
-    except FileNotFoundError as err:
-        logging.error("Erro ao fazer o download do arquivo ZIP: %s",err)
+    size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if total is not None and size != total:
+        logging.error("Tamanho do arquivo ZIP inválido: %s bytes (esperado %s).", size, total)
+        return False
+    if expected_md5 is not None and file_md5(part_path, chunk_size) != expected_md5.lower():
+        logging.error("Checksum MD5 do arquivo ZIP inválido. O download será refeito.")
+        os.remove(part_path)
         return False
 
+    os.replace(part_path, zip_file_path)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    logging.info("Download do arquivo ZIP concluído com sucesso: %.1f MB em %.1f s (%.2f MB/s).",
+                 downloaded / 1e6, elapsed, downloaded / 1e6 / elapsed)
+    return True
+
+def find_zip_member(zip_ref, file_name):
+    """
+    Localiza um arquivo dentro do ZIP (por exemplo, "ratings.csv" -> "ml-25m/ratings.csv").
+
+    Args:
+        zip_ref (zipfile.ZipFile): O arquivo ZIP aberto.
+        file_name (str): O nome do arquivo procurado.
+
+    Returns:
+        str: O nome do membro no ZIP.
+
+    Raises:
+        KeyError: Se o arquivo não existir no ZIP.
+    """
+    for member in zip_ref.namelist():
+        if member == file_name or member.endswith("/" + file_name):
+            return member
+    raise KeyError(f"'{file_name}' não encontrado no arquivo ZIP.")
+
 # Função para extrair arquivos CSV do ZIP
-def extract_csv_files(output_directory):
+def extract_csv_files(output_directory, csv_files=None):
     """
     Extrai arquivos CSV do arquivo ZIP.
 
     Args:
         output_directory (str): O caminho para o diretório de saída.
+        csv_files (list): Arquivos a extrair. Se None, todo o conteúdo do ZIP é extraído.
 
     Returns:
         bool: True se a extração foi bem-sucedida, False em caso de erro.
     """
     try:
         with zipfile.ZipFile(os.path.join(output_directory, "movielens_data.zip"), "r") as zip_ref:
-            zip_ref.extractall(output_directory)
+            if csv_files is None:
+                zip_ref.extractall(output_directory)
+            else:
+                for file_name in csv_files:
+                    zip_ref.extract(find_zip_member(zip_ref, file_name), output_directory)
         logging.info("Arquivos CSV extraídos com sucesso.")
         return True
 
-    except FileExistsError as err:
+    except (FileExistsError, KeyError, zipfile.BadZipFile) as err:
         logging.error("Erro ao extrair arquivos CSV do ZIP: %s",err)
         return False
 
+@contextlib.contextmanager
+def open_csv(file_name, output_directory, from_zip=False):
+    """
+    Abre um CSV do MovieLens para leitura, extraído ou diretamente de dentro do ZIP.
+
+    Args:
+        file_name (str): O nome do arquivo CSV.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, o CSV é lido do ZIP sem ser gravado em disco.
+
+    Yields:
+        file: O arquivo aberto em modo binário.
+    """
+    if from_zip:
+        with zipfile.ZipFile(os.path.join(output_directory, "movielens_data.zip"), "r") as zip_ref:
+            with zip_ref.open(find_zip_member(zip_ref, file_name)) as csv_file:
+                yield csv_file
+    else:
+        with open(os.path.join(output_directory+"/ml-25m", file_name), "rb") as csv_file:
+            yield csv_file
+
+def csv_source_path(file_name, output_directory, from_zip=False):
+    """
+    Retorna o arquivo de origem de um CSV, usado para verificar se os caches estão atualizados.
+
+    Args:
+        file_name (str): O nome do arquivo CSV.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, a origem é o próprio arquivo ZIP.
+
+    Returns:
+        str: O caminho do CSV extraído ou do ZIP.
+    """
+    if from_zip:
+        return os.path.join(output_directory, "movielens_data.zip")
+    return os.path.join(output_directory+"/ml-25m", file_name)
+
+def sparse_module():
+    """
+    Importa scipy.sparse sob demanda, mantendo a importação deste módulo rápida.
+
+    Returns:
+        module: O módulo scipy.sparse.
+    """
+    from scipy import sparse  # pylint: disable=import-outside-toplevel
+    return sparse
+
+def file_signature(file_path):
+    """
+    Gera uma assinatura simples (tamanho e data de modificação) de um arquivo.
+
+    Args:
+        file_path (str): O caminho do arquivo.
+
+    Returns:
+        list: [tamanho em bytes, mtime em nanossegundos] ou None se o arquivo não existir.
+    """
+    try:
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+    except OSError:
+        return None
+
+# Colunas do cache colunar de avaliações e seus tipos compactos
+RATINGS_CACHE_DTYPES = {
+    "userId": np.int32,
+    "movieId": np.int32,
+    "rating": np.uint8,  # meias-estrelas: rating * 2
+    "timestamp": np.int64,
+}
+
+def ratings_cache_directory(output_directory):
+    """
+    Retorna o diretório do cache colunar de avaliações.
+
+    Args:
+        output_directory (str): O caminho para o diretório de saída.
+
+    Returns:
+        str: O caminho do cache.
+    """
+    return os.path.join(output_directory, "ratings_cache")
+
+def read_ratings_cache_metadata(cache_directory):
+    """
+    Lê os metadados do cache colunar de avaliações.
+
+    Args:
+        cache_directory (str): O diretório do cache.
+
+    Returns:
+        dict: Os metadados ou None se o cache não existir ou estiver incompleto.
+    """
+    try:
+        with open(os.path.join(cache_directory, "metadata.json"), encoding="utf-8") as metadata_file:
+            return json.load(metadata_file)
+    except (OSError, ValueError):
+        return None
+
+def ratings_cache_is_fresh(cache_directory, source_path):
+    """
+    Verifica se o cache foi gerado a partir da versão atual do arquivo de origem.
+
+    Args:
+        cache_directory (str): O diretório do cache.
+        source_path (str): O caminho do ratings.csv (ou do ZIP, se lido diretamente dele).
+
+    Returns:
+        bool: True se o cache estiver completo e atualizado.
+    """
+    metadata = read_ratings_cache_metadata(cache_directory)
+    signature = file_signature(source_path)
+    return metadata is not None and signature is not None and \
+        metadata["source_signature"] == signature
+
+def convert_ratings_to_cache(csv_path, cache_directory, include_timestamp=False,
+                             chunksize=2_000_000, source_signature=None):
+    """
+    Converte o ratings.csv em um cache colunar compacto (um arquivo binário por coluna).
+
+    O CSV é lido em blocos, de modo que a memória fica limitada ao tamanho do
+    bloco: userId e movieId viram int32, rating vira uint8 (meias-estrelas)
+    e timestamp é opcional.
+
+    Args:
+        csv_path (str | file): O caminho do ratings.csv ou o arquivo já aberto.
+        cache_directory (str): O diretório do cache.
+        include_timestamp (bool): Se True, também salva a coluna timestamp.
+        chunksize (int): Número de linhas lidas por bloco.
+        source_signature (list): Assinatura da origem (padrão: a de csv_path).
+
+    Returns:
+        int: O número de avaliações convertidas.
+    """
+    columns = ["userId", "movieId", "rating"] + (["timestamp"] if include_timestamp else [])
+    os.makedirs(cache_directory, exist_ok=True)
+    metadata_path = os.path.join(cache_directory, "metadata.json")
+    if os.path.exists(metadata_path):
+        os.remove(metadata_path)
+
+    signature = source_signature if source_signature is not None else file_signature(csv_path)
+    rows = 0
+    column_files = {name: open(os.path.join(cache_directory, f"{name}.bin"), "wb")
+                    for name in columns}
+    try:
+        read_dtypes = {"userId": np.int32, "movieId": np.int32,
+                       "rating": np.float32, "timestamp": np.int64}
+        for chunk in pd.read_csv(csv_path, usecols=columns, dtype=read_dtypes,
+                                 chunksize=chunksize):
+            chunk["rating"] = np.rint(chunk["rating"].to_numpy() * 2)
+            for name in columns:
+                chunk[name].to_numpy(dtype=RATINGS_CACHE_DTYPES[name]).tofile(column_files[name])
+            rows += chunk.shape[0]
+    finally:
+        for column_file in column_files.values():
+            column_file.close()
+
+    with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+        json.dump({"rows": rows, "columns": columns, "source_signature": signature},
+                  metadata_file)
+    logging.info("Cache colunar de avaliações criado com %s linhas.", rows)
+    return rows
+
+def load_ratings_cache(cache_directory):
+    """
+    Carrega o cache colunar de avaliações com memory-map.
+
+    userId, movieId e timestamp são mapeados diretamente do disco; apenas
+    rating é convertido de volta para float32.
+
+    Args:
+        cache_directory (str): O diretório do cache.
+
+    Returns:
+        pd.DataFrame: As avaliações ou None se o cache não existir.
+    """
+    metadata = read_ratings_cache_metadata(cache_directory)
+    if metadata is None:
+        return None
+
+    columns = {}
+    for name in metadata["columns"]:
+        columns[name] = np.memmap(os.path.join(cache_directory, f"{name}.bin"),
+                                  dtype=RATINGS_CACHE_DTYPES[name], mode="r",
+                                  shape=(metadata["rows"],))
+    columns["rating"] = columns["rating"].astype(np.float32) / np.float32(2)
+    return pd.DataFrame(columns, copy=False)
+
+def load_ratings(csv_path, output_directory, from_zip=False):
+    """
+    Carrega as avaliações a partir do cache colunar, gerando-o se necessário.
+
+    Args:
+        csv_path (str): O caminho do ratings.csv.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, o cache é gerado lendo o ratings.csv de dentro do ZIP.
+
+    Returns:
+        pd.DataFrame: As avaliações.
+    """
+    cache_directory = ratings_cache_directory(output_directory)
+    source_path = csv_source_path("ratings.csv", output_directory, from_zip) if from_zip \
+        else csv_path
+    if not ratings_cache_is_fresh(cache_directory, source_path):
+        if from_zip:
+            with open_csv("ratings.csv", output_directory, from_zip=True) as csv_file:
+                convert_ratings_to_cache(csv_file, cache_directory,
+                                         source_signature=file_signature(source_path))
+        else:
+            convert_ratings_to_cache(csv_path, cache_directory)
+    return load_ratings_cache(cache_directory)
+
 # Função para carregar os arquivos CSV em DataFrames
-def load_data(csv_path, output_directory):
+def load_data(csv_path, output_directory, from_zip=False):
     """
     Carrega os arquivos CSV em DataFrames do pandas.
 
     Args:
         csv_files (list): Lista de nomes de arquivos CSV.
         output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, os CSVs são lidos diretamente do ZIP, sem extração.
 
     Returns:
         dict: Um dicionário contendo DataFrames com os dados carregados.
@@ -165,7 +556,11 @@ def load_data(csv_path, output_directory):
         data = {}
         for file_name in csv_path:
             file_path = os.path.join(output_directory+"/ml-25m", file_name)
-            data[file_name.split(".", maxsplit=1)[0]] = pd.read_csv(file_path)
+            if file_name == "ratings.csv":
+                data["ratings"] = load_ratings(file_path, output_directory, from_zip=from_zip)
+            else:
+                with open_csv(file_name, output_directory, from_zip=from_zip) as csv_file:
+                    data[file_name.split(".", maxsplit=1)[0]] = pd.read_csv(csv_file)
         logging.info("Dados carregados com sucesso.")
         return data
 
@@ -173,23 +568,73 @@ def load_data(csv_path, output_directory):
         logging.error("Erro ao carregar os dados CSV: %s",err)
         return None
 
+def cached_data_is_fresh(csv_files, output_directory, from_zip=False):
+    """
+    Verifica se os dados já extraídos podem ser usados sem baixar e extrair o ZIP.
+
+    Args:
+        csv_files (list): Lista de nomes de arquivos CSV.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, os CSVs são lidos do ZIP e basta que ele exista.
+
+    Returns:
+        bool: True se todos os CSVs existem e o cache de avaliações está atualizado.
+    """
+    for file_name in csv_files:
+        source_path = csv_source_path(file_name, output_directory, from_zip)
+        if not os.path.exists(source_path):
+            return False
+        if file_name == "ratings.csv" and \
+                not ratings_cache_is_fresh(ratings_cache_directory(output_directory), source_path):
+            return False
+    return True
+
+def prepare_data(zip_url, csv_files, output_directory, from_zip=False):
+    """
+    Garante que os CSVs estejam disponíveis no diretório de saída, baixando e extraindo se necessário.
+
+    Apenas os arquivos em csv_files são extraídos; com from_zip=True nada é
+    extraído e os CSVs são lidos diretamente do ZIP.
+
+    Args:
+        zip_url (str): A URL do arquivo ZIP a ser baixado.
+        csv_files (list): Lista de nomes de arquivos CSV.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, não extrai os CSVs.
+
+    Returns:
+        bool: True se os dados estão prontos para serem carregados, False em caso de erro.
+    """
+    if create_output_directory(output_directory):
+        if cached_data_is_fresh(csv_files, output_directory, from_zip=from_zip):
+            logging.info("Cache de dados atualizado. Download e extração ignorados.")
+            return True
+        checksum_url = ZIP_MD5_URL if zip_url == ZIP_URL else None
+        if download_zip(zip_url, output_directory, checksum_url=checksum_url):
+            return from_zip or extract_csv_files(output_directory, csv_files)
+
+    return False
+
 # Função principal que chama as etapas
-def download_and_extract_data(zip_url, csv_files, output_directory):
+def download_and_extract_data(zip_url, csv_files, output_directory, from_zip=False):
     """
     Função principal que baixa, extrai e carrega os dados.
 
+    Se os CSVs já extraídos estiverem presentes e o cache de avaliações
+    estiver atualizado, o download e a extração são ignorados.
+
     Args:
         zip_url (str): A URL do arquivo ZIP a ser baixado.
         csv_files (list): Lista de nomes de arquivos CSV.
         output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, os CSVs são lidos diretamente do ZIP, sem extração.
 
     Returns:
         dict: Um dicionário contendo DataFrames com os dados carregados.
     """
-    if create_output_directory(output_directory):
-        if download_zip(zip_url, output_directory):
-            if extract_csv_files(output_directory):
-                return load_data(csv_path=csv_files, output_directory=output_directory)
+    if prepare_data(zip_url, csv_files, output_directory, from_zip=from_zip):
+        return load_data(csv_path=csv_files, output_directory=output_directory,
+                         from_zip=from_zip)
 
     return None
 
@@ -206,111 +651,1677 @@ def clean_title(title):
     title = re.sub("[^a-zA-Z0-9 ]", "", title)
     return title
 
-# Chama a função para baixar e extrair os dados
-data = download_and_extract_data(ZIP_URL, csv_files, OUTPUT_DIRECTORY)
+class TitleIndex:
+    """
+    Índice TF-IDF dos títulos de filmes.
+
+    O vetorizador é ajustado uma única vez; o vocabulário, os pesos IDF e a
+    matriz CSR são salvos em disco e carregados com memory-map. As consultas
+    apenas transformam o título pesquisado. O índice é reconstruído
+    automaticamente quando o arquivo de origem (movies.csv) muda.
+
+    Args:
+        index_directory (str): Diretório onde o índice é salvo.
+        ngram_range (tuple): Intervalo de n-gramas usado pelo TfidfVectorizer.
+    """
+
+    METADATA_FILE = "metadata.json"
+    VOCABULARY_FILE = "vocabulary.json"
+    ARRAY_FILES = ("idf", "data", "indices", "indptr")
+
+    def __init__(self, index_directory, ngram_range=(1, 2)):
+        # pylint: disable-next=import-outside-toplevel
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.index_directory = index_directory
+        self.ngram_range = tuple(ngram_range)
+        self.vectorizer = TfidfVectorizer(ngram_range=self.ngram_range)
+        self.matrix = None
+        self._matrix_t = None
+        self.source_signature = None
+
+    def fit(self, titles, source_signature=None):
+        """
+        Ajusta o vetorizador e calcula a matriz TF-IDF dos títulos.
+
+        Args:
+            titles (iterable): Títulos já limpos, na mesma ordem do DataFrame de filmes.
+            source_signature (list): Assinatura do arquivo de origem.
+
+        Returns:
+            TitleIndex: O próprio índice.
+        """
+        self.matrix = self.vectorizer.fit_transform(titles).tocsr()
+        self.source_signature = source_signature
+        logging.info("Índice de títulos ajustado com %s títulos.", self.matrix.shape[0])
+        return self
+
+    def save(self):
+        """
+        Salva o vocabulário, os pesos IDF e a matriz CSR no diretório do índice.
+
+        O arquivo de metadados é escrito por último, de modo que um índice
+        parcialmente salvo nunca é considerado válido.
+        """
+        os.makedirs(self.index_directory, exist_ok=True)
+        metadata_path = os.path.join(self.index_directory, self.METADATA_FILE)
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+
+        vocabulary = self.vectorizer.get_feature_names_out().tolist()
+        with open(os.path.join(self.index_directory, self.VOCABULARY_FILE), "w",
+                  encoding="utf-8") as vocabulary_file:
+            json.dump(vocabulary, vocabulary_file)
+
+        arrays = {
+            "idf": self.vectorizer.idf_,
+            "data": self.matrix.data,
+            "indices": self.matrix.indices,
+            "indptr": self.matrix.indptr,
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(self.index_directory, f"{name}.npy"), array)
+
+        metadata = {
+            "shape": list(self.matrix.shape),
+            "ngram_range": list(self.ngram_range),
+            "source_signature": self.source_signature,
+        }
+        with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+            json.dump(metadata, metadata_file)
+        logging.info("Índice de títulos salvo em '%s'.", self.index_directory)
+
+    def read_metadata(self):
+        """
+        Lê os metadados do índice salvo.
+
+        Returns:
+            dict: Os metadados ou None se o índice não existir ou estiver corrompido.
+        """
+        try:
+            with open(os.path.join(self.index_directory, self.METADATA_FILE),
+                      encoding="utf-8") as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def load(self):
+        """
+        Carrega o índice salvo, mapeando as matrizes em memória (memory-map).
+
+        Returns:
+            bool: True se o índice foi carregado, False caso contrário.
+        """
+        metadata = self.read_metadata()
+        if metadata is None or tuple(metadata["ngram_range"]) != self.ngram_range:
+            return False
+
+        try:
+            with open(os.path.join(self.index_directory, self.VOCABULARY_FILE),
+                      encoding="utf-8") as vocabulary_file:
+                vocabulary = json.load(vocabulary_file)
+            arrays = {
+                name: np.load(os.path.join(self.index_directory, f"{name}.npy"), mmap_mode="r")
+                for name in self.ARRAY_FILES
+            }
+        except (OSError, ValueError) as err:
+            logging.error("Erro ao carregar o índice de títulos: %s", err)
+            return False
+
+        self.vectorizer.vocabulary_ = {term: i for i, term in enumerate(vocabulary)}
+        self.vectorizer.fixed_vocabulary_ = False
+        self.vectorizer.idf_ = np.asarray(arrays["idf"])
+        self.matrix = sparse_module().csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(metadata["shape"]),
+            copy=False,
+        )
+        self.source_signature = metadata["source_signature"]
+        logging.info("Índice de títulos carregado de '%s'.", self.index_directory)
+        return True
+
+    def load_or_build(self, titles, source_path):
+        """
+        Garante que o índice esteja atualizado em relação ao arquivo de origem.
+
+        Usa o índice em memória se ainda for válido; caso contrário, tenta
+        carregá-lo do disco e, em último caso, ajusta e salva um novo índice.
+
+        Args:
+            titles (iterable): Títulos limpos, usados apenas se for necessário reconstruir.
+            source_path (str): Caminho do arquivo de origem (movies.csv).
+
+        Returns:
+            TitleIndex: O próprio índice.
+        """
+        signature = file_signature(source_path)
+        if self.matrix is not None and self.source_signature == signature:
+            return self
+
+        metadata = self.read_metadata()
+        if metadata is not None and metadata["source_signature"] == signature and self.load():
+            return self
+
+        self.fit(titles, source_signature=signature)
+        self.save()
+        return self
+
+    def query(self, title, k=5, allowed=None):
+        """
+        Retorna as posições dos títulos mais semelhantes ao título informado.
+
+        Args:
+            title (str): O título já limpo.
+            k (int): Número de resultados.
+            allowed (np.ndarray): Vetor booleano com as posições aceitas (padrão: todas).
+
+        Returns:
+            tuple: (posições, similaridades), ordenadas da mais para a menos semelhante.
+        """
+        indices, similarity = self.query_many([title], k=k, allowed=allowed)
+        return indices[0], similarity[0]
+
+    def query_many(self, titles, k=5, chunk_size=QUERY_CHUNK_SIZE, allowed=None):
+        """
+        Retorna, para cada título, as posições dos k títulos mais semelhantes.
+
+        Todas as consultas são transformadas de uma vez e comparadas com a
+        matriz por meio de um único produto esparso por bloco de chunk_size
+        consultas, o que limita a memória da matriz densa de similaridades.
+
+        Args:
+            titles (list): Os títulos já limpos.
+            k (int): Número de resultados por título.
+            chunk_size (int): Número de consultas processadas por bloco.
+            allowed (np.ndarray): Vetor booleano com as posições aceitas (padrão: todas).
+                As demais são descartadas antes da seleção do top-k.
+
+        Returns:
+            tuple: Matrizes (n, k) de posições e similaridades, ordenadas por linha
+            da mais para a menos semelhante.
+        """
+        queries = self.vectorizer.transform(titles)
+        if self._matrix_t is None or self._matrix_t.shape[::-1] != self.matrix.shape:
+            self._matrix_t = self.matrix.T.tocsr()
+        k = min(k, self.matrix.shape[0] if allowed is None else int(np.count_nonzero(allowed)))
+
+        indices = np.empty((queries.shape[0], k), dtype=np.int64)
+        similarity = np.empty((queries.shape[0], k), dtype=np.float64)
+        if k == 0:
+            return indices, similarity
+        for start in range(0, queries.shape[0], chunk_size):
+            # As linhas já são normalizadas (L2), logo o produto é a similaridade do cosseno
+            chunk = (queries[start:start + chunk_size] @ self._matrix_t).toarray()
+            if allowed is not None:
+                chunk[:, ~allowed] = -np.inf
+            top = np.argpartition(chunk, -k, axis=1)[:, -k:]
+            top_similarity = np.take_along_axis(chunk, top, axis=1)
+            order = np.argsort(-top_similarity, axis=1, kind="stable")
+            indices[start:start + chunk.shape[0]] = np.take_along_axis(top, order, axis=1)
+            similarity[start:start + chunk.shape[0]] = np.take_along_axis(top_similarity, order,
+                                                                          axis=1)
+        return indices, similarity
+
+class TypeaheadIndex:
+    """
+    Índice invertido de prefixos sobre os títulos limpos, para a pesquisa incremental.
+
+    Os tokens de cada título ficam em uma lista ordenada; os títulos que
+    contêm um token começando por um prefixo são obtidos com uma busca
+    binária nessa lista. Cada token digitado é tratado como prefixo e os
+    conjuntos de candidatos são intersectados. Um LRU guarda os candidatos
+    das consultas recentes.
+
+    Args:
+        titles (iterable): Títulos já limpos, na mesma ordem do DataFrame de filmes.
+        cache_size (int): Número de consultas mantidas no LRU.
+    """
+
+    # Acima deste número de candidatos, a ordenação usa apenas o tamanho do título
+    RANK_LIMIT = 2048
+
+    def __init__(self, titles, cache_size=TYPEAHEAD_CACHE_SIZE):
+        postings = {}
+        self.title_tokens = []
+        for position, title in enumerate(titles):
+            tokens = tuple(dict.fromkeys(title.lower().split()))
+            self.title_tokens.append(tokens)
+            for token in tokens:
+                postings.setdefault(token, []).append(position)
+        self.tokens = sorted(postings)
+        self.postings = [np.asarray(postings[token], dtype=np.int32) for token in self.tokens]
+        self.title_lengths = np.fromiter((len(title) for title in titles), dtype=np.int32)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def prefix_candidates(self, prefix):
+        """
+        Retorna os títulos que têm algum token começando pelo prefixo.
+
+        Args:
+            prefix (str): O prefixo, em minúsculas.
+
+        Returns:
+            np.ndarray: Posições dos títulos, em ordem crescente.
+        """
+        low = bisect.bisect_left(self.tokens, prefix)
+        high = bisect.bisect_left(self.tokens, prefix + "\U0010ffff", lo=low)
+        if high - low == 1:
+            return self.postings[low]
+        if high == low:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(self.postings[low:high]))
+
+    def candidates(self, query):
+        """
+        Retorna os títulos que casam com todos os tokens da consulta (usando o LRU).
+
+        Args:
+            query (str): A consulta normalizada (ver normalize_query).
+
+        Returns:
+            np.ndarray: Posições dos títulos, em ordem crescente.
+        """
+        cached = self._cache.get(query)
+        if cached is not None:
+            self._cache.move_to_end(query)
+            return cached
+
+        result = None
+        for token in query.split():
+            matches = self.prefix_candidates(token)
+            result = matches if result is None else \
+                np.intersect1d(result, matches, assume_unique=True)
+            if result.shape[0] == 0:
+                break
+        if result is None:
+            result = np.empty(0, dtype=np.int32)
+
+        self._cache[query] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def filter_candidates(self, candidates, prefixes):
+        """
+        Mantém apenas os candidatos que têm tokens começando por todos os prefixos.
+
+        Args:
+            candidates (np.ndarray): Posições dos títulos já selecionados.
+            prefixes (list): Os prefixos a verificar.
+
+        Returns:
+            np.ndarray: As posições que continuam válidas.
+        """
+        keep = [position for position in candidates
+                if all(any(token.startswith(prefix) for token in self.title_tokens[position])
+                       for prefix in prefixes)]
+        return np.asarray(keep, dtype=np.int32)
+
+    def rank(self, candidates, query, k=5):
+        """
+        Ordena os candidatos pelo número de tokens da consulta que aparecem completos no título.
+
+        Títulos mais curtos desempatam. Acima de RANK_LIMIT candidatos (prefixos
+        muito curtos), apenas o tamanho do título é usado.
+
+        Args:
+            candidates (np.ndarray): Posições dos títulos candidatos.
+            query (str): A consulta normalizada.
+            k (int): Número de resultados.
+
+        Returns:
+            np.ndarray: As k melhores posições, da melhor para a pior.
+        """
+        if candidates.shape[0] == 0:
+            return candidates
+        score = -self.title_lengths[candidates].astype(np.float64)
+        if candidates.shape[0] <= self.RANK_LIMIT:
+            tokens = query.split()
+            matches = np.fromiter(
+                (sum(token in self.title_tokens[position] for token in tokens)
+                 for position in candidates), dtype=np.float64, count=candidates.shape[0])
+            score += matches * 1e4
+        k = min(k, candidates.shape[0])
+        top = np.argpartition(score, -k)[-k:]
+        return candidates[top[np.argsort(-score[top], kind="stable")]]
+
+def normalize_query(text):
+    """
+    Normaliza o texto digitado da mesma forma que clean_title, em minúsculas.
+
+    Args:
+        text (str): O texto digitado.
+
+    Returns:
+        str: A consulta normalizada, com tokens separados por um espaço.
+    """
+    return " ".join(clean_title(text).lower().split())
+
+class TypeaheadSession:
+    """
+    Estado incremental da pesquisa de um usuário enquanto ele digita.
 
+    Quando a nova consulta estende a anterior, os candidatos anteriores são
+    apenas filtrados, em vez de a pesquisa recomeçar do índice.
 
-try:
-    if data:
-        movies = data["movies"]
-        ratings = data["ratings"]
-        movies["clean_title"] = movies["title"].apply(clean_title)
+    Args:
+        index (TypeaheadIndex): O índice de prefixos.
+    """
+
+    # Acima deste número de candidatos, o refinamento usa o índice em vez de filtrar título a título
+    FILTER_LIMIT = 2048
+
+    def __init__(self, index):
+        self.index = index
+        self.query = ""
+        self.current = None
+
+    def candidates(self, text):
+        """
+        Atualiza a sessão com o texto digitado e retorna os títulos candidatos.
+
+        Args:
+            text (str): O texto digitado até o momento.
+
+        Returns:
+            np.ndarray: Posições dos títulos candidatos.
+        """
+        query = normalize_query(text)
+        if self.current is not None and self.query and query.startswith(self.query):
+            previous_tokens = self.query.split()
+            tokens = query.split()
+            # Tokens novos ou estendidos em relação à consulta anterior
+            changed = [token for i, token in enumerate(tokens)
+                       if i >= len(previous_tokens) or token != previous_tokens[i]]
+            if not changed:
+                pass
+            elif self.current.shape[0] <= self.FILTER_LIMIT:
+                self.current = self.index.filter_candidates(self.current, changed)
+            else:
+                for token in changed:
+                    self.current = np.intersect1d(self.current, self.index.prefix_candidates(token),
+                                                  assume_unique=True)
+        else:
+            self.current = self.index.candidates(query)
+        self.query = query
+        return self.current
+
+    def search(self, text, k=5):
+        """
+        Retorna as posições dos k melhores títulos para o texto digitado.
+
+        Args:
+            text (str): O texto digitado até o momento.
+            k (int): Número de resultados.
+
+        Returns:
+            np.ndarray: As posições, da melhor para a pior.
+        """
+        return self.index.rank(self.candidates(text), self.query, k=k)
+
+def parse_genres(genres):
+    """
+    Normaliza um filtro de gêneros.
+
+    Args:
+        genres (str | iterable): Gêneros separados por "|" (como na coluna genres)
+            ou uma lista de gêneros.
+
+    Returns:
+        tuple: Os gêneros, sem repetições e em ordem alfabética, ou None se o filtro estiver vazio.
+    """
+    if genres is None:
+        return None
+    if isinstance(genres, str):
+        genres = genres.split("|")
+    genres = tuple(sorted({genre.strip() for genre in genres if genre.strip()}))
+    return genres or None
+
+class GenreIndex:
+    """
+    Máscaras de bits dos gêneros de cada filme.
+
+    A coluna genres (separada por "|") é lida uma única vez: cada gênero
+    recebe um bit e cada filme uma máscara uint32 com os bits dos seus
+    gêneros. As máscaras ficam em duas formas: por posição no DataFrame de
+    filmes (masks) e em um vetor denso indexado por movieId
+    (masks_by_movie_id). Os filtros são operações bit a bit vetorizadas.
+
+    Args:
+        movies (pd.DataFrame): Os filmes, com as colunas movieId e genres.
+    """
+
+    def __init__(self, movies):
+        dummies = movies["genres"].fillna("").str.get_dummies(sep="|")
+        if dummies.shape[1] > 32:
+            raise ValueError(f"Gêneros demais para uma máscara de 32 bits: {dummies.shape[1]}.")
+        self.names = list(dummies.columns)
+        self.bits = {name: np.uint32(1 << bit) for bit, name in enumerate(self.names)}
+        weights = (np.uint32(1) << np.arange(len(self.names), dtype=np.uint32))
+        self.masks = (dummies.to_numpy(dtype=np.uint32) * weights).sum(axis=1, dtype=np.uint32)
+
+        movie_ids = movies["movieId"].to_numpy()
+        self.masks_by_movie_id = np.zeros(int(movie_ids.max(initial=0)) + 1, dtype=np.uint32)
+        self.masks_by_movie_id[movie_ids] = self.masks
+
+    def mask(self, genres):
+        """
+        Converte uma lista de gêneros na máscara de bits correspondente.
+
+        Args:
+            genres (str | iterable): Os gêneros (ver parse_genres).
+
+        Returns:
+            np.uint32: A máscara.
+        """
+        unknown = [genre for genre in parse_genres(genres) or () if genre not in self.bits]
+        if unknown:
+            raise ValueError(f"Gêneros desconhecidos: {unknown}. Disponíveis: {self.names}")
+        mask = np.uint32(0)
+        for genre in parse_genres(genres) or ():
+            mask |= self.bits[genre]
+        return mask
+
+    @staticmethod
+    def matches(masks, mask, match_all=False):
+        """
+        Aplica o filtro a um vetor de máscaras.
+
+        Args:
+            masks (np.ndarray): As máscaras dos filmes.
+            mask (np.uint32): A máscara do filtro.
+            match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
+
+        Returns:
+            np.ndarray: Vetor booleano com os filmes aceitos.
+        """
+        if match_all:
+            return (masks & mask) == mask
+        return (masks & mask) != 0
+
+    def positions(self, genres, match_all=False):
+        """
+        Filtro por posição no DataFrame de filmes.
+
+        Args:
+            genres (str | iterable): Os gêneros.
+            match_all (bool): Se True, exige todos os gêneros.
+
+        Returns:
+            np.ndarray: Vetor booleano alinhado com as linhas do DataFrame de filmes.
+        """
+        return self.matches(self.masks, self.mask(genres), match_all)
+
+    def movie_ids(self, genres, match_all=False):
+        """
+        Filtro indexado por movieId.
+
+        Args:
+            genres (str | iterable): Os gêneros.
+            match_all (bool): Se True, exige todos os gêneros.
+
+        Returns:
+            np.ndarray: Vetor booleano em que a posição i indica se o movieId i é aceito.
+        """
+        return self.matches(self.masks_by_movie_id, self.mask(genres), match_all)
+
+class RatingsMatrix:
+    """
+    Matriz esparsa usuário × filme com as avaliações altas (rating > 4).
+
+    A matriz é construída uma única vez, em formato CSR (usuário -> filmes
+    curtidos) e CSC (filme -> usuários que curtiram). As porcentagens
+    "similar" e "all" de find_similar_movies passam a ser calculadas com
+    fatiamento esparso e np.bincount, sem varrer o DataFrame de avaliações.
+
+    O denominador de "all" é pré-calculado: movie_like_counts guarda quantos
+    usuários curtiram cada filme e liked_user_count quantos usuários curtiram
+    algum filme, de modo que "all" é uma divisão vetorial sobre os candidatos.
+
+    Novas avaliações (add_ratings) entram em uma pequena matriz de acréscimos
+    consultada junto com a principal; quando ela cresce além de
+    compact_threshold interações, as duas são fundidas (compact).
+
+    Args:
+        ratings (pd.DataFrame): Avaliações com as colunas userId, movieId e rating.
+        min_rating (float): Avaliações estritamente maiores que este valor contam como "curtidas".
+        compact_threshold (int): Tamanho da matriz de acréscimos que dispara a fusão.
+    """
+
+    def __init__(self, ratings, min_rating=4, compact_threshold=INGEST_COMPACT_THRESHOLD):
+        self.min_rating = min_rating
+        self.compact_threshold = compact_threshold
+        user_ids, movie_ids = self.liked_pairs(ratings)
+        shape = (int(user_ids.max(initial=0)) + 1, int(movie_ids.max(initial=0)) + 1)
+        self.by_user, self.by_movie = self._build(user_ids, movie_ids, shape)
+        self._reset_additions()
+        logging.info("Matriz esparsa de avaliações construída com %s interações.",
+                     self.by_user.nnz)
+
+    def liked_pairs(self, ratings):
+        """
+        Extrai os pares (usuário, filme) com nota alta de um DataFrame de avaliações.
+
+        Args:
+            ratings (pd.DataFrame): Avaliações com as colunas userId, movieId e rating.
+
+        Returns:
+            tuple: Arrays int32 de userId e movieId.
+        """
+        liked = ratings["rating"].to_numpy() > self.min_rating
+        return (ratings["userId"].to_numpy()[liked].astype(np.int32),
+                ratings["movieId"].to_numpy()[liked].astype(np.int32))
+
+    @staticmethod
+    def _build(user_ids, movie_ids, shape):
+        """
+        Constrói as matrizes CSR e CSC a partir dos pares curtidos.
+
+        Args:
+            user_ids (np.ndarray): Os IDs dos usuários.
+            movie_ids (np.ndarray): Os IDs dos filmes.
+            shape (tuple): O formato (usuários, filmes) da matriz.
+
+        Returns:
+            tuple: As matrizes (CSR por usuário, CSC por filme).
+        """
+        interactions = sparse_module().coo_matrix(
+            (np.ones(user_ids.shape[0], dtype=np.int8), (user_ids, movie_ids)), shape=shape
+        )
+        by_user = interactions.tocsr()
+        # Avaliações repetidas de um mesmo par usuário/filme contam uma única vez
+        by_user.data[:] = 1
+        return by_user, by_user.tocsc()
+
+    def _reset_additions(self):
+        """Esvazia a matriz de acréscimos e recalcula as contagens de curtidas."""
+        self._added_users = np.empty(0, dtype=np.int32)
+        self._added_movies = np.empty(0, dtype=np.int32)
+        self.added_by_user, self.added_by_movie = self._build(
+            self._added_users, self._added_movies, self.by_user.shape)
+        self.movie_like_counts = np.diff(self.by_movie.indptr)
+        self.liked_user_count = int(np.count_nonzero(np.diff(self.by_user.indptr)))
+
+    @property
+    def n_users(self):
+        """int: Número de linhas (userId máximo + 1) da matriz."""
+        return self.by_user.shape[0]
+
+    @property
+    def n_movies(self):
+        """int: Número de colunas (movieId máximo + 1) da matriz."""
+        return self.by_user.shape[1]
+
+    @property
+    def nnz(self):
+        """int: Número total de interações (matriz principal + acréscimos)."""
+        return self.by_user.nnz + self.added_by_user.nnz
+
+    def users_who_liked(self, movie_id):
+        """
+        Retorna os usuários que deram nota alta ao filme.
+
+        Args:
+            movie_id (int): O ID do filme.
+
+        Returns:
+            np.ndarray: Os IDs dos usuários.
+        """
+        if not 0 <= movie_id < self.n_movies:
+            return np.empty(0, dtype=np.int32)
+        users = []
+        for matrix in (self.by_movie, self.added_by_movie):
+            indptr = matrix.indptr
+            users.append(matrix.indices[indptr[movie_id]:indptr[movie_id + 1]])
+        return np.concatenate(users) if users[1].shape[0] else users[0]
+
+    def movies_liked_by(self, user_ids):
+        """
+        Retorna os filmes curtidos pelos usuários (um item por par usuário/filme).
+
+        Args:
+            user_ids (np.ndarray): Os IDs dos usuários.
+
+        Returns:
+            np.ndarray: Os IDs dos filmes, com repetições.
+        """
+        liked = self.by_user[user_ids].indices
+        if self.added_by_user.nnz:
+            liked = np.concatenate([liked, self.added_by_user[user_ids].indices])
+        return liked
+
+    def similar_scores(self, movie_id, threshold=0.10, allowed=None):
+        """
+        Calcula as porcentagens "similar" e "all" e o score dos filmes candidatos.
+
+        "all" é a fração de todos os usuários com alguma curtida que curtiram o
+        candidato. Em relação à versão original (que dividia pelos usuários que
+        curtiram algum dos candidatos), os scores mudam por um fator constante
+        por consulta e a ordenação é a mesma.
+
+        Args:
+            movie_id (int): O ID do filme de referência.
+            threshold (float): Fração mínima de usuários semelhantes que curtiram o candidato.
+            allowed (np.ndarray): Vetor booleano indexado por movieId com os candidatos
+                aceitos (padrão: todos). Os demais são descartados na seleção dos candidatos.
+
+        Returns:
+            pd.DataFrame: Colunas similar, all e score indexadas por movieId,
+            ordenadas pelo score em ordem decrescente.
+        """
+        similar_users = self.users_who_liked(movie_id)
+        if similar_users.shape[0] == 0:
+            return pd.DataFrame(columns=["similar", "all", "score"])
+
+        liked_by_similar = self.movies_liked_by(similar_users)
+        similar = np.bincount(liked_by_similar, minlength=self.n_movies) / similar_users.shape[0]
+        selected = similar > threshold
+        if allowed is not None:
+            allowed = allowed[:self.n_movies]
+            selected[:allowed.shape[0]] &= allowed
+            selected[allowed.shape[0]:] = False
+        candidates = np.flatnonzero(selected)
+        all_users = self.movie_like_counts[candidates] / self.liked_user_count
+
+        rec_percentages = pd.DataFrame(
+            {"similar": similar[candidates], "all": all_users},
+            index=pd.Index(candidates, name="movieId"),
+        )
+        rec_percentages["score"] = rec_percentages["similar"] / rec_percentages["all"]
+        return rec_percentages.sort_values("score", ascending=False)
+
+    def add_ratings(self, ratings):
+        """
+        Acrescenta novas avaliações à matriz, sem reconstruí-la.
+
+        Apenas as notas altas entram na matriz; pares usuário/filme já
+        curtidos são ignorados. As avaliações são tratadas como um log
+        apenas de acréscimos.
+
+        Args:
+            ratings (pd.DataFrame): Avaliações com as colunas userId, movieId e rating.
+
+        Returns:
+            tuple: Arrays de userId e movieId dos pares efetivamente acrescentados.
+        """
+        user_ids, movie_ids = self.liked_pairs(ratings)
+        if user_ids.shape[0] == 0:
+            return user_ids, movie_ids
+
+        pairs = np.unique(user_ids.astype(np.int64) << 32 | movie_ids.astype(np.int64))
+        user_ids = (pairs >> 32).astype(np.int32)
+        movie_ids = (pairs & 0xFFFFFFFF).astype(np.int32)
+
+        shape = (max(self.n_users, int(user_ids.max()) + 1),
+                 max(self.n_movies, int(movie_ids.max()) + 1))
+        if shape != self.by_user.shape:
+            for matrix in (self.by_user, self.by_movie, self.added_by_user, self.added_by_movie):
+                matrix.resize(shape)
+            self.movie_like_counts = np.pad(self.movie_like_counts,
+                                            (0, shape[1] - self.movie_like_counts.shape[0]))
+
+        # Descarta os pares que já estavam curtidos
+        existing = np.asarray(self.by_user[user_ids, movie_ids]).ravel() + \
+            np.asarray(self.added_by_user[user_ids, movie_ids]).ravel()
+        new = existing == 0
+        user_ids, movie_ids = user_ids[new], movie_ids[new]
+
+        # Usuários sem nenhuma curtida até agora aumentam o denominador global
+        users = np.unique(user_ids)
+        previous_likes = np.diff(self.by_user.indptr)[users] + \
+            np.diff(self.added_by_user.indptr)[users]
+        self.liked_user_count += int(np.count_nonzero(previous_likes == 0))
+
+        self._added_users = np.concatenate([self._added_users, user_ids])
+        self._added_movies = np.concatenate([self._added_movies, movie_ids])
+        if self._added_users.shape[0] > self.compact_threshold:
+            self.compact()
+        else:
+            self.added_by_user, self.added_by_movie = self._build(
+                self._added_users, self._added_movies, shape)
+            self.movie_like_counts += np.bincount(movie_ids, minlength=shape[1]).astype(
+                self.movie_like_counts.dtype)
+        return user_ids, movie_ids
+
+    def compact(self):
+        """Funde a matriz de acréscimos à matriz principal."""
+        base = self.by_user.tocoo()
+        self.by_user, self.by_movie = self._build(
+            np.concatenate([base.row.astype(np.int32), self._added_users]),
+            np.concatenate([base.col.astype(np.int32), self._added_movies]),
+            self.by_user.shape)
+        self._reset_additions()
+        logging.info("Acréscimos fundidos à matriz de avaliações (%s interações).",
+                     self.by_user.nnz)
+
+def similar_movie_scores_pandas(ratings_df, movie_id):
+    """
+    Calcula os scores de filmes similares diretamente sobre o DataFrame de avaliações.
 
+    Implementação de referência (varreduras com máscaras booleanas) usada
+    para validar RatingsMatrix.similar_scores.
 
-except Exception as err:
-    logging.error("Erro ao carregar os dados: %s",err)
+    Args:
+        ratings_df (pd.DataFrame): Avaliações com as colunas userId, movieId e rating.
+        movie_id (int): O ID do filme.
+
+    Returns:
+        pd.DataFrame: Colunas similar, all e score indexadas por movieId.
+    """
+    similar_users = ratings_df[(ratings_df["movieId"] == movie_id) & (ratings_df["rating"] > 4)]\
+    ["userId"].unique()
+    similar_user_recs = ratings_df[(ratings_df["userId"].isin(similar_users)) & \
+                                (ratings_df["rating"] > 4)]["movieId"]
+    similar_user_recs = similar_user_recs.value_counts() / len(similar_users)
+
+    similar_user_recs = similar_user_recs[similar_user_recs > 0.10]
+    all_users = ratings_df[(ratings_df["movieId"].\
+                         isin(similar_user_recs.index)) & (ratings_df["rating"] > 4)]
+    all_user_recs = all_users["movieId"].value_counts() / \
+        len(all_users["userId"].unique())
+    rec_percentages = pd.concat([similar_user_recs, all_user_recs], axis=1)
+    rec_percentages.columns = ["similar", "all"]
+
+    rec_percentages["score"] = \
+        rec_percentages["similar"] / rec_percentages["all"]
+    return rec_percentages.sort_values("score", ascending=False)
+
+class SimilarityTable:
+    """
+    Tabela pré-calculada movieId -> top-k filmes similares e seus scores.
+
+    A tabela é salva como arrays numpy compactos (movieId ordenado, matriz
+    k×n de IDs e matriz k×n de scores) e carregada com memory-map, de modo
+    que a consulta é uma busca binária.
+
+    Args:
+        movie_ids (np.ndarray): IDs dos filmes, em ordem crescente.
+        top_ids (np.ndarray): Matriz (n, k) com os IDs recomendados (-1 completa linhas curtas).
+        top_scores (np.ndarray): Matriz (n, k) com os scores (NaN completa linhas curtas).
+        source_signature (list): Assinatura do ratings.csv usado no cálculo.
+        liked_user_count (int): Denominador global de "all" usado no cálculo.
+    """
+
+    METADATA_FILE = "metadata.json"
+    ARRAY_FILES = ("movie_ids", "top_ids", "top_scores")
+
+    def __init__(self, movie_ids, top_ids, top_scores, source_signature=None,
+                 liked_user_count=None):
+        self.movie_ids = movie_ids
+        self.top_ids = top_ids
+        self.top_scores = top_scores
+        self.source_signature = source_signature
+        self.liked_user_count = liked_user_count
+
+    @property
+    def k(self):
+        """int: Número de recomendações armazenadas por filme."""
+        return self.top_ids.shape[1]
+
+    def save(self, table_directory):
+        """
+        Salva a tabela em disco. Os metadados são escritos por último.
+
+        Args:
+            table_directory (str): Diretório de destino.
+        """
+        os.makedirs(table_directory, exist_ok=True)
+        metadata_path = os.path.join(table_directory, self.METADATA_FILE)
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        for name in self.ARRAY_FILES:
+            np.save(os.path.join(table_directory, f"{name}.npy"), getattr(self, name))
+        with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+            json.dump({"k": self.k, "source_signature": self.source_signature,
+                       "liked_user_count": self.liked_user_count}, metadata_file)
+        logging.info("Tabela de similaridade salva em '%s'.", table_directory)
+
+    @classmethod
+    def load(cls, table_directory):
+        """
+        Carrega uma tabela salva com memory-map.
+
+        Args:
+            table_directory (str): Diretório da tabela.
+
+        Returns:
+            SimilarityTable: A tabela ou None se ela não existir ou estiver incompleta.
+        """
+        try:
+            with open(os.path.join(table_directory, cls.METADATA_FILE),
+                      encoding="utf-8") as metadata_file:
+                metadata = json.load(metadata_file)
+            arrays = [np.load(os.path.join(table_directory, f"{name}.npy"), mmap_mode="r")
+                      for name in cls.ARRAY_FILES]
+        except (OSError, ValueError):
+            return None
+        return cls(*arrays, source_signature=metadata["source_signature"],
+                   liked_user_count=metadata.get("liked_user_count"))
+
+    def lookup(self, movie_id, liked_user_count=None):
+        """
+        Consulta as recomendações pré-calculadas de um filme.
+
+        Como o score é proporcional ao denominador global de "all", os scores
+        são reescalados quando liked_user_count difere do usado no cálculo.
+
+        Args:
+            movie_id (int): O ID do filme.
+            liked_user_count (int): O denominador global atual.
+
+        Returns:
+            pd.Series: Scores indexados por movieId, em ordem decrescente,
+            ou None se o filme não estiver na tabela.
+        """
+        position = np.searchsorted(self.movie_ids, movie_id)
+        if position >= self.movie_ids.shape[0] or self.movie_ids[position] != movie_id:
+            return None
+        ids = self.top_ids[position]
+        found = ids >= 0
+        scores = np.asarray(self.top_scores[position][found], dtype=np.float64)
+        if liked_user_count is not None and self.liked_user_count:
+            scores = scores * (liked_user_count / self.liked_user_count)
+        return pd.Series(scores, index=pd.Index(ids[found], name="movieId"), name="score")
+
+# Matriz de avaliações compartilhada pelos processos do cálculo em lote
+_worker_ratings_matrix = None
+
+def _init_precompute_worker(matrix):
+    """
+    Inicializa um processo do cálculo em lote com a matriz de avaliações.
+
+    Args:
+        matrix (RatingsMatrix): A matriz de avaliações.
+    """
+    global _worker_ratings_matrix  # pylint: disable=global-statement
+    _worker_ratings_matrix = matrix
+
+def _precompute_chunk(movie_ids, k):
+    """
+    Calcula o top-k de um bloco de filmes em um processo do pool.
+
+    Args:
+        movie_ids (np.ndarray): IDs dos filmes do bloco.
+        k (int): Número de recomendações por filme.
+
+    Returns:
+        tuple: Matrizes (n, k) de IDs e scores.
+    """
+    top_ids = np.full((movie_ids.shape[0], k), -1, dtype=np.int32)
+    top_scores = np.full((movie_ids.shape[0], k), np.nan, dtype=np.float32)
+    for row, movie_id in enumerate(movie_ids):
+        scores = _worker_ratings_matrix.similar_scores(int(movie_id))["score"].head(k)
+        top_ids[row, :scores.shape[0]] = scores.index.to_numpy()
+        top_scores[row, :scores.shape[0]] = scores.to_numpy()
+    return top_ids, top_scores
+
+def precompute_similar_movies(matrix, movie_ids, k=10, workers=None, chunk_size=512,
+                              source_signature=None):
+    """
+    Calcula em lote o top-k de filmes similares para cada filme, usando todos os núcleos.
+
+    Args:
+        matrix (RatingsMatrix): A matriz de avaliações.
+        movie_ids (iterable): IDs dos filmes a calcular.
+        k (int): Número de recomendações por filme.
+        workers (int): Número de processos (padrão: os.cpu_count()).
+        chunk_size (int): Número de filmes enviados a cada tarefa do pool.
+        source_signature (list): Assinatura do ratings.csv usado no cálculo.
+
+    Returns:
+        SimilarityTable: A tabela calculada.
+    """
+    movie_ids = np.unique(np.asarray(movie_ids, dtype=np.int32))
+    chunks = [movie_ids[i:i + chunk_size] for i in range(0, movie_ids.shape[0], chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_precompute_worker,
+                             initargs=(matrix,)) as executor:
+        results = list(executor.map(_precompute_chunk, chunks, [k] * len(chunks)))
+
+    top_ids = np.concatenate([ids for ids, _ in results]) if results \
+        else np.empty((0, k), dtype=np.int32)
+    top_scores = np.concatenate([scores for _, scores in results]) if results \
+        else np.empty((0, k), dtype=np.float32)
+    logging.info("Top-%s pré-calculado para %s filmes.", k, movie_ids.shape[0])
+    return SimilarityTable(movie_ids, top_ids, top_scores, source_signature=source_signature,
+                           liked_user_count=matrix.liked_user_count)
+
+class ResultCache:
+    """
+    Cache limitado de resultados, com despejo por tamanho (LRU) e por tempo (TTL).
+
+    Cada entrada guarda a versão dos dados com que foi calculada; uma
+    consulta com outra versão descarta a entrada. Entradas também podem
+    receber etiquetas (tags) para invalidação seletiva. Os contadores de
+    acertos, falhas e despejos ajudam a dimensionar o cache. As operações
+    são protegidas por um lock, para uso a partir de várias threads.
+
+    Args:
+        maxsize (int): Número máximo de entradas.
+        ttl (float): Tempo de vida das entradas, em segundos (None para não expirar).
+        clock (callable): Relógio usado para o TTL (padrão: time.monotonic).
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version=None):
+        """
+        Busca um resultado no cache.
+
+        Args:
+            key (hashable): A chave da consulta.
+            version (hashable): A versão atual dos dados.
+
+        Returns:
+            tuple: (True, valor) em caso de acerto ou (False, None) em caso de falha.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, value, _ = entry
+                if entry_version != version:
+                    del self._entries[key]
+                    self.invalidations += 1
+                elif expires_at is not None and expires_at <= self.clock():
+                    del self._entries[key]
+                    self.evictions += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, version=None, tags=None):
+        """
+        Guarda um resultado, despejando a entrada menos usada se o cache estiver cheio.
+
+        Args:
+            key (hashable): A chave da consulta.
+            value (object): O resultado.
+            version (hashable): A versão dos dados usada no cálculo.
+            tags (frozenset): Etiquetas usadas por invalidate(tags=...).
+        """
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, version, value, tags or frozenset())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys=None, tags=None):
+        """
+        Remove entradas do cache.
+
+        Sem argumentos, todas as entradas são removidas.
+
+        Args:
+            keys (iterable): As chaves a remover.
+            tags (iterable): Remove também as entradas com alguma destas etiquetas.
+        """
+        with self._lock:
+            if keys is None and tags is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            keys = set(keys or ())
+            if tags is not None:
+                tags = set(tags)
+                keys.update(key for key, entry in self._entries.items()
+                            if not tags.isdisjoint(entry[3]))
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: hits, misses, evictions, invalidations, size e maxsize.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+class MovieLensDataset:
+    """
+    Conjunto de dados MovieLens carregado sob demanda.
+
+    Nada é baixado, extraído ou lido na criação do objeto: movies e ratings
+    são carregados no primeiro acesso e mantidos em memória.
+
+    Args:
+        zip_url (str): A URL do arquivo ZIP a ser baixado.
+        csv_files (list): Lista de nomes de arquivos CSV.
+        output_directory (str): O caminho para o diretório de saída.
+        from_zip (bool): Se True, os CSVs são lidos diretamente do ZIP, sem extração.
+    """
+
+    def __init__(self, zip_url=ZIP_URL, csv_files=None, output_directory=OUTPUT_DIRECTORY,
+                 from_zip=False):
+        self.zip_url = zip_url
+        self.csv_files = list(csv_files) if csv_files is not None else list(CSV_FILES)
+        self.output_directory = output_directory
+        self.from_zip = from_zip
+        self._prepared = False
+        self._frames = {}
+        self._pending_ratings = []
+
+    def source_path(self, file_name):
+        """
+        Retorna o arquivo de origem de um CSV (o CSV extraído ou o ZIP).
+
+        Args:
+            file_name (str): O nome do arquivo CSV.
+
+        Returns:
+            str: O caminho do arquivo.
+        """
+        return csv_source_path(file_name, self.output_directory, self.from_zip)
+
+    def _load(self, file_name):
+        """
+        Carrega um CSV (uma única vez), baixando e extraindo os dados se necessário.
+
+        Args:
+            file_name (str): O nome do arquivo CSV.
+
+        Returns:
+            pd.DataFrame: Os dados carregados.
+        """
+        key = file_name.split(".", maxsplit=1)[0]
+        if key not in self._frames:
+            if not self._prepared:
+                self._prepared = prepare_data(self.zip_url, self.csv_files,
+                                              self.output_directory, from_zip=self.from_zip)
+            data = load_data(csv_path=[file_name], output_directory=self.output_directory,
+                             from_zip=self.from_zip) if self._prepared else None
+            if not data:
+                raise RuntimeError(f"Não foi possível carregar '{file_name}'.")
+            self._frames[key] = data[key]
+        return self._frames[key]
+
+    def data_version(self, file_name):
+        """
+        Retorna a versão atual de um arquivo de dados (sua assinatura em disco).
+
+        Args:
+            file_name (str): O nome do arquivo CSV.
+
+        Returns:
+            tuple: A assinatura do arquivo de origem ou None se ele não existir.
+        """
+        signature = file_signature(self.source_path(file_name))
+        return tuple(signature) if signature is not None else None
+
+    @property
+    def movies(self):
+        """pd.DataFrame: Os filmes, com a coluna clean_title."""
+        if "movies" not in self._frames:
+            movies = self._load("movies.csv")
+            movies["clean_title"] = movies["title"].apply(clean_title)
+        return self._frames["movies"]
+
+    @property
+    def ratings(self):
+        """pd.DataFrame: As avaliações dos usuários, incluindo as acrescentadas por append_ratings."""
+        ratings = self._load("ratings.csv")
+        if self._pending_ratings:
+            batches = [batch.astype(ratings.dtypes[batch.columns.intersection(ratings.columns)])
+                       for batch in self._pending_ratings]
+            ratings = pd.concat([ratings, *batches], ignore_index=True)
+            self._frames["ratings"] = ratings
+            self._pending_ratings = []
+        return ratings
+
+    def reload(self, file_name):
+        """
+        Descarta um arquivo já carregado, para que seja lido de novo no próximo acesso.
+
+        Para ratings.csv, os lotes de append_ratings também são descartados.
+
+        Args:
+            file_name (str): O nome do arquivo CSV.
+        """
+        key = file_name.split(".", maxsplit=1)[0]
+        self._frames.pop(key, None)
+        if key == "ratings":
+            self._pending_ratings = []
+
+    def append_ratings(self, batch):
+        """
+        Acrescenta um lote de avaliações, concatenado a ratings no próximo acesso.
+
+        Args:
+            batch (pd.DataFrame): Avaliações com as colunas userId, movieId e rating.
+        """
+        self._pending_ratings.append(batch)
+
+class MovieRecommender:
+    """
+    Recomendador de filmes construído sobre um MovieLensDataset.
+
+    O índice de títulos, a matriz de avaliações e a tabela pré-calculada são
+    criados sob demanda, na primeira pesquisa ou recomendação. Os resultados
+    de search e find_similar_movies passam por um ResultCache, invalidado
+    quando a versão de movies.csv ou ratings.csv muda.
+
+    Args:
+        dataset (MovieLensDataset): O conjunto de dados (padrão: um novo MovieLensDataset).
+        cache_size (int): Número máximo de resultados em cada cache.
+        cache_ttl (float): Tempo de vida dos resultados em cache, em segundos.
+    """
+
+    def __init__(self, dataset=None, cache_size=RESULT_CACHE_SIZE, cache_ttl=RESULT_CACHE_TTL):
+        self.dataset = dataset if dataset is not None else MovieLensDataset()
+        self.search_cache = ResultCache(maxsize=cache_size, ttl=cache_ttl)
+        self.similar_cache = ResultCache(maxsize=cache_size, ttl=cache_ttl)
+        self._title_index = None
+        self._ratings_matrix = None
+        self._ratings_matrix_version = None
+        self._similarity_table = None
+        self._typeahead_index = None
+        self._genre_index = None
+        self._stale_movies = set()
+
+    @property
+    def title_index(self):
+        """TitleIndex: O índice TF-IDF dos títulos, atualizado em relação a movies.csv."""
+        if self._title_index is None:
+            self._title_index = TitleIndex(
+                os.path.join(self.dataset.output_directory, "title_index"))
+        movies = self.dataset.movies
+        return self._title_index.load_or_build(movies["clean_title"],
+                                               self.dataset.source_path("movies.csv"))
+
+    @property
+    def typeahead_index(self):
+        """TypeaheadIndex: O índice de prefixos usado pela pesquisa incremental."""
+        if self._typeahead_index is None:
+            self._typeahead_index = TypeaheadIndex(self.dataset.movies["clean_title"])
+        return self._typeahead_index
+
+    @property
+    def genre_index(self):
+        """GenreIndex: As máscaras de gêneros dos filmes, calculadas uma única vez."""
+        if self._genre_index is None:
+            self._genre_index = GenreIndex(self.dataset.movies)
+        return self._genre_index
+
+    def typeahead_session(self):
+        """
+        Cria uma sessão de pesquisa incremental (uma por usuário digitando).
+
+        Returns:
+            TypeaheadSession: A nova sessão.
+        """
+        return TypeaheadSession(self.typeahead_index)
+
+    def typeahead(self, text, k=5, session=None):
+        """
+        Pesquisa incremental: retorna os filmes que casam com o texto digitado até agora.
+
+        Args:
+            text (str): O texto digitado.
+            k (int): Número de resultados.
+            session (TypeaheadSession): Sessão do usuário; sem sessão, a consulta é avulsa.
+
+        Returns:
+            pd.DataFrame: Os filmes encontrados, do melhor para o pior.
+        """
+        session = session if session is not None else self.typeahead_session()
+        return self.dataset.movies.iloc[session.search(text, k=k)]
+
+    @property
+    def ratings_matrix(self):
+        """RatingsMatrix: A matriz esparsa de avaliações altas, reconstruída se ratings.csv mudar."""
+        version = self.dataset.data_version("ratings.csv")
+        if self._ratings_matrix is not None and self._ratings_matrix_version != version:
+            logging.info("ratings.csv mudou; reconstruindo a matriz de avaliações.")
+            self.dataset.reload("ratings.csv")
+            self._ratings_matrix = None
+            self._stale_movies.clear()
+        if self._ratings_matrix is None:
+            self._ratings_matrix = RatingsMatrix(self.dataset.ratings)
+            self._ratings_matrix_version = version
+        return self._ratings_matrix
+
+    @property
+    def similarity_table_directory(self):
+        """str: O diretório da tabela pré-calculada."""
+        return os.path.join(self.dataset.output_directory, "similarity_table")
+
+    @property
+    def similarity_table(self):
+        """SimilarityTable: A tabela pré-calculada, ou None se não existir ou estiver desatualizada."""
+        if self._similarity_table is None:
+            self._similarity_table = SimilarityTable.load(self.similarity_table_directory)
+        if self._similarity_table is not None and self._similarity_table.source_signature != \
+                file_signature(self.dataset.source_path("ratings.csv")):
+            logging.info("Tabela de similaridade desatualizada; usando cálculo ao vivo.")
+            self._similarity_table = None
+        return self._similarity_table
+
+    def build_similarity_table(self, k=10, workers=None):
+        """
+        Job em lote: pré-calcula as recomendações de todos os filmes e salva a tabela.
+
+        Args:
+            k (int): Número de recomendações por filme.
+            workers (int): Número de processos (padrão: os.cpu_count()).
+
+        Returns:
+            SimilarityTable: A tabela salva.
+        """
+        table = precompute_similar_movies(
+            self.ratings_matrix, self.dataset.movies["movieId"], k=k, workers=workers,
+            source_signature=file_signature(self.dataset.source_path("ratings.csv")))
+        table.save(self.similarity_table_directory)
+        self._similarity_table = table
+        self._stale_movies.clear()
+        return table
+
+    def add_ratings(self, batch):
+        """
+        Acrescenta novas avaliações sem recarregar ratings.csv nem reconstruir a matriz.
+
+        As curtidas do lote atualizam a matriz de avaliações no lugar. São
+        invalidados apenas os resultados em cache afetados: os dos filmes
+        curtidos no lote, os dos demais filmes curtidos pelos mesmos usuários
+        e os que têm algum desses filmes entre os candidatos. Se o lote traz
+        usuários que ainda não tinham curtidas, o denominador global muda e o
+        cache inteiro é invalidado. As linhas afetadas da tabela pré-calculada
+        passam a ser calculadas ao vivo.
+
+        Args:
+            batch (pd.DataFrame | list): Avaliações com userId, movieId e rating
+                (um DataFrame ou uma lista de dicionários).
+
+        Returns:
+            int: Número de novas curtidas acrescentadas à matriz.
+        """
+        batch = pd.DataFrame(batch)
+        missing = {"userId", "movieId", "rating"}.difference(batch.columns)
+        if missing:
+            raise ValueError(f"Colunas ausentes no lote de avaliações: {sorted(missing)}")
+        if batch.empty:
+            return 0
+
+        # A matriz é construída antes de o lote entrar no dataset, para não contá-lo duas vezes
+        matrix = self.ratings_matrix
+        liked_user_count = matrix.liked_user_count
+        self.dataset.append_ratings(batch)
+        user_ids, movie_ids = matrix.add_ratings(batch)
+        if user_ids.shape[0] == 0:
+            return 0
+
+        new_movies = set(np.unique(movie_ids).tolist())
+        affected = new_movies.union(np.unique(matrix.movies_liked_by(np.unique(user_ids))).tolist())
+        if matrix.liked_user_count != liked_user_count:
+            # O denominador global mudou: todos os scores em cache mudaram de escala
+            self.similar_cache.invalidate()
+        else:
+            self.similar_cache.invalidate(
+                tags=new_movies.union(("query", movie) for movie in affected))
+
+        table = self.similarity_table
+        if table is not None:
+            stale_rows = np.isin(table.top_ids, list(new_movies)).any(axis=1)
+            affected.update(table.movie_ids[stale_rows].tolist())
+        self._stale_movies.update(affected)
+        logging.info("%s novas curtidas acrescentadas; %s filmes afetados.",
+                     user_ids.shape[0], len(affected))
+        return int(user_ids.shape[0])
+
+    def cache_stats(self):
+        """
+        Retorna os contadores dos caches de resultados.
+
+        Returns:
+            dict: As estatísticas dos caches "search" e "similar".
+        """
+        return {"search": self.search_cache.stats(), "similar": self.similar_cache.stats()}
+
+    def search(self, title, genres=None, match_all=False):
+        """
+        Realiza a pesquisa de filmes com base no título.
+
+        Args:
+            title (str): O título do filme a ser pesquisado.
+            genres (str | list): Restringe a pesquisa a estes gêneros (ex.: "Animation|Children").
+            match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
+
+        Returns:
+            pd.DataFrame: Um DataFrame contendo os resultados da pesquisa.
+        """
+        try:
+            title = clean_title(title)
+            genres = parse_genres(genres)
+            key = (title, genres, match_all and genres is not None)
+            version = self.dataset.data_version("movies.csv")
+            found, results = self.search_cache.get(key, version)
+            if not found:
+                allowed = self.genre_index.positions(genres, match_all) if genres else None
+                indices, _ = self.title_index.query(title, k=5, allowed=allowed)
+                results = self.dataset.movies.iloc[indices]
+                self.search_cache.set(key, results, version)
+            return results.copy()
+        except AssertionError as err:
+            logging.error("Erro na pesquisa: %s",err)
+            return pd.DataFrame()
+
+    def search_many(self, titles, k=5, genres=None, match_all=False):
+        """
+        Pesquisa vários títulos de uma só vez.
+
+        Args:
+            titles (list): Os títulos a serem pesquisados.
+            k (int): Número de resultados por título.
+            genres (str | list): Restringe a pesquisa a estes gêneros.
+            match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
+
+        Returns:
+            pd.DataFrame: Os k filmes mais semelhantes a cada título, indexados
+            pela consulta original e com a coluna score (similaridade do cosseno).
+        """
+        titles = list(titles)
+        if not titles:
+            return pd.DataFrame()
+        genres = parse_genres(genres)
+        allowed = self.genre_index.positions(genres, match_all) if genres else None
+        indices, similarity = self.title_index.query_many([clean_title(title) for title in titles],
+                                                          k=k, allowed=allowed)
+        results = self.dataset.movies.iloc[indices.ravel()].reset_index(drop=True)
+        results.insert(0, "score", similarity.ravel())
+        results.index = pd.Index(np.repeat(titles, indices.shape[1]), name="query")
+        return results
+
+    def find_similar_movies(self, movie_id, genres=None, match_all=False):
+        """
+        Encontra filmes similares com base no ID do filme.
+
+        Usa a tabela pré-calculada quando disponível e recorre ao cálculo ao
+        vivo para filmes que não estão nela. Com um filtro de gêneros, os
+        candidatos são filtrados antes da seleção dos 10 melhores (a tabela,
+        calculada sem filtro, não é usada).
+
+        Args:
+            movie_id (int): O ID do filme.
+            genres (str | list): Restringe as recomendações a estes gêneros.
+            match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
+
+        Returns:
+            pd.DataFrame: Um DataFrame contendo os filmes similares encontrados.
+        """
+        genres = parse_genres(genres)
+        if genres is not None:
+            # Gêneros desconhecidos levantam ValueError em vez de resultar em uma lista vazia
+            self.genre_index.mask(genres)
+        try:
+            movie_id = int(movie_id)
+            key = (movie_id, genres, match_all and genres is not None)
+            version = (self.dataset.data_version("movies.csv"),
+                       self.dataset.data_version("ratings.csv"))
+            found, results = self.similar_cache.get(key, version)
+            if not found:
+                table = self.similarity_table if genres is None else None
+                scores = None
+                if table is not None and movie_id not in self._stale_movies:
+                    scores = table.lookup(movie_id, self.ratings_matrix.liked_user_count)
+                if scores is None:
+                    allowed = self.genre_index.movie_ids(genres, match_all) if genres else None
+                    scores = self.ratings_matrix.similar_scores(movie_id, allowed=allowed)["score"]
+                results = scores.head(10).to_frame("score").merge(
+                    self.dataset.movies, left_index=True, right_on="movieId"
+                )[["score", "title", "genres"]]
+                # Os candidatos etiquetam a entrada: uma nova curtida em qualquer um
+                # deles muda a porcentagem "all" e invalida o resultado. A etiqueta
+                # ("query", movieId) cobre todas as variantes de filtro do filme.
+                self.similar_cache.set(key, results, version,
+                                       tags=frozenset(scores.index.tolist()) | {("query", movie_id)})
+            return results.copy()
+        except Exception as err:
+            logging.error("Erro ao encontrar filmes similares: %s",err)
+            return pd.DataFrame()
+
+_recommender = None
+
+def get_recommender():
+    """
+    Retorna o recomendador padrão do módulo, criando-o no primeiro uso.
+
+    Returns:
+        MovieRecommender: O recomendador sobre OUTPUT_DIRECTORY.
+    """
+    global _recommender  # pylint: disable=global-statement
+    if _recommender is None:
+        _recommender = MovieRecommender()
+    return _recommender
+
+# Antigos globais do módulo, mantidos como atalhos carregados sob demanda
+_LAZY_ATTRIBUTES = {
+    "data": lambda: {"movies": get_recommender().dataset.movies,
+                     "ratings": get_recommender().dataset.ratings},
+    "movies": lambda: get_recommender().dataset.movies,
+    "ratings": lambda: get_recommender().dataset.ratings,
+    "title_index": lambda: get_recommender().title_index,
+    "vectorizer": lambda: get_recommender().title_index.vectorizer,
+    "ratings_matrix": lambda: get_recommender().ratings_matrix,
+    "similarity_table": lambda: get_recommender().similarity_table,
+}
+
+def __getattr__(name):
+    """
+    Resolve os antigos globais (movies, ratings, vectorizer...) sob demanda.
+
+    Args:
+        name (str): O nome do atributo.
+
+    Returns:
+        object: O valor do atributo.
+    """
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get_ratings_matrix():
+    """
+    Retorna a matriz esparsa de avaliações, construindo-a na primeira chamada.
+
+    Returns:
+        RatingsMatrix: A matriz de avaliações altas.
+    """
+    return get_recommender().ratings_matrix
+
+def get_similarity_table():
+    """
+    Retorna a tabela pré-calculada, se existir e corresponder ao ratings.csv atual.
+
+    Returns:
+        SimilarityTable: A tabela ou None.
+    """
+    return get_recommender().similarity_table
+
+def build_similarity_table(k=10, workers=None):
+    """
+    Job em lote: pré-calcula as recomendações de todos os filmes e salva a tabela.
+
+    Args:
+        k (int): Número de recomendações por filme.
+        workers (int): Número de processos (padrão: os.cpu_count()).
+
+    Returns:
+        SimilarityTable: A tabela salva.
+    """
+    return get_recommender().build_similarity_table(k=k, workers=workers)
 
 def vectorized_data():
     """
     Realiza a vetorização dos títulos de filmes.
 
+    O índice só é reajustado quando movies.csv muda; nas demais chamadas a
+    matriz já ajustada (em memória ou em disco) é reutilizada.
+
     Returns:
         scipy.sparse.csr_matrix: A matriz de recursos TF-IDF dos títulos de filmes.
     """
     try:
-        movies["clean_title"] = movies["title"].apply(clean_title)
-        logging.info("Título limpo")
-        tfidf = vectorizer.fit_transform(movies["clean_title"])
-        logging.info("Títulos vetorizados")
-
-        return tfidf
+        return get_recommender().title_index.matrix
     except Exception as err:
         logging.error("Erro na limpeza do título e vetorização dos dados: %s",err)
         return None
 
-
-
-
 # Função para realizar a pesquisa com base no título
-def search(title):
+def search(title, genres=None, match_all=False):
     """
     Realiza a pesquisa de filmes com base no título.
 
     Args:
         title (str): O título do filme a ser pesquisado.
+        genres (str | list): Restringe a pesquisa a estes gêneros (ex.: "Animation|Children").
+        match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
 
     Returns:
         pd.DataFrame: Um DataFrame contendo os resultados da pesquisa.
     """
-    try:
-        title = clean_title(title)
-        tfidf = vectorized_data()
-        query_vec = vectorizer.transform([title])
-        similarity = cosine_similarity(query_vec, tfidf).flatten()
-        indices = np.argpartition(similarity, -5)[-5:]
-        results = movies.iloc[indices].iloc[::-1]
-        return results
-    except AssertionError as err:
-        logging.error("Erro na pesquisa: %s",err)
-        return pd.DataFrame()
+    return get_recommender().search(title, genres=genres, match_all=match_all)
+
+def search_many(titles, k=5, genres=None, match_all=False):
+    """
+    Pesquisa vários títulos de uma só vez (um único produto esparso por bloco).
+
+    Args:
+        titles (list): Os títulos a serem pesquisados.
+        k (int): Número de resultados por título.
+        genres (str | list): Restringe a pesquisa a estes gêneros.
+        match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
+
+    Returns:
+        pd.DataFrame: Os resultados de todas as consultas, indexados pela consulta.
+    """
+    return get_recommender().search_many(titles, k=k, genres=genres, match_all=match_all)
 
 # Função para encontrar filmes similares
-def find_similar_movies(movie_id):
+def find_similar_movies(movie_id, genres=None, match_all=False):
     """
     Encontra filmes similares com base no ID do filme.
 
     Args:
         movie_id (int): O ID do filme.
+        genres (str | list): Restringe as recomendações a estes gêneros (ex.: "Animation|Children").
+        match_all (bool): Se True, exige todos os gêneros; senão, basta um deles.
 
     Returns:
         pd.DataFrame: Um DataFrame contendo os filmes similares encontrados.
     """
-    try:
-        similar_users = ratings[(ratings["movieId"] == movie_id) & (ratings["rating"] > 4)]\
-        ["userId"].unique()
-        similar_user_recs = ratings[(ratings["userId"].isin(similar_users)) & \
-                                    (ratings["rating"] > 4)]["movieId"]
-        similar_user_recs = similar_user_recs.value_counts() / len(similar_users)
-
-        similar_user_recs = similar_user_recs[similar_user_recs > 0.10]
-        all_users = ratings[(ratings["movieId"].\
-                             isin(similar_user_recs.index)) & (ratings["rating"] > 4)]
-        all_user_recs = all_users["movieId"].value_counts() / \
-            len(all_users["userId"].unique())
-        rec_percentages = pd.concat([similar_user_recs, all_user_recs], axis=1)
-        rec_percentages.columns = ["similar", "all"]
-
-        rec_percentages["score"] = \
-            rec_percentages["similar"] / rec_percentages["all"]
-        rec_percentages = rec_percentages.sort_values("score", ascending=False)
-        return rec_percentages.head(10)\
-            .merge(movies, left_index=True, right_on="movieId")[["score", "title", "genres"]]
-    except Exception as err:
-        logging.error("Erro ao encontrar filmes similares: %s",err)
-        return pd.DataFrame()
+    return get_recommender().find_similar_movies(movie_id, genres=genres, match_all=match_all)
+
+
+def add_ratings(batch):
+    """
+    Acrescenta novas avaliações ao recomendador padrão, sem reconstruí-lo.
+
+    Args:
+        batch (pd.DataFrame | list): Avaliações com userId, movieId e rating.
+
+    Returns:
+        int: Número de novas curtidas acrescentadas.
+    """
+    return get_recommender().add_ratings(batch)
+
+def cache_stats():
+    """
+    Retorna os contadores (acertos, falhas, despejos) dos caches do recomendador padrão.
 
+    Returns:
+        dict: As estatísticas dos caches "search" e "similar".
+    """
+    return get_recommender().cache_stats()
 
-def on_type_recommendation():
+def typeahead(text, k=5, session=None):
     """
-    Função para realizar uma pesquisa e recomendar filmes com base no título "Toy Story".
+    Pesquisa incremental por prefixo, para ser chamada a cada tecla digitada.
+
+    Args:
+        text (str): O texto digitado.
+        k (int): Número de resultados.
+        session (TypeaheadSession): Sessão do usuário (ver new_typeahead_session).
+
+    Returns:
+        pd.DataFrame: Os filmes encontrados, do melhor para o pior.
+    """
+    return get_recommender().typeahead(text, k=k, session=session)
+
+def new_typeahead_session():
+    """
+    Cria uma sessão de pesquisa incremental no recomendador padrão.
+
+    Returns:
+        TypeaheadSession: A nova sessão.
+    """
+    return get_recommender().typeahead_session()
+
+def on_type_recommendation(title="Toy Story", session=None):
+    """
+    Função para realizar uma pesquisa e recomendar filmes com base no título informado.
+
+    Pensada para ser chamada a cada tecla: usa a pesquisa incremental por
+    prefixo e recorre à pesquisa TF-IDF completa se nada casar com o texto.
+
+    Args:
+        title (str): O título digitado (padrão: "Toy Story").
+        session (TypeaheadSession): Sessão do usuário, reaproveitada entre as teclas.
     """
-    title = "Toy Story"
     if len(title) > 5:
-        results = search(title)
+        results = typeahead(title, session=session)
+        if results.empty:
+            results = search(title)
         if not results.empty:
             movie_id = results.iloc[0]["movieId"]
             recommendations = find_similar_movies(movie_id)
             if not recommendations.empty:
                 print(recommendations)
 
-on_type_recommendation()
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Recomendação de filmes com o MovieLens 25M.")
+    parser.add_argument("title", nargs="?", default="Toy Story",
+                        help="Título usado na pesquisa (padrão: Toy Story).")
+    parser.add_argument("--precompute", action="store_true",
+                        help="Pré-calcula a tabela de recomendações de todos os filmes.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de processos do pré-cálculo (padrão: todos os núcleos).")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if args.precompute:
+        build_similarity_table(workers=args.workers)
+    else:
+        on_type_recommendation(args.title)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Serviço HTTP de Recomendação de Filmes
+
+Este módulo expõe as pesquisas e recomendações de movie_recommendations
+em um servidor HTTP assíncrono (aiohttp).
+
+Os dados são carregados uma única vez, na inicialização. O cálculo (pandas,
+numpy e scipy) roda em um pool de threads, sem bloquear o loop de eventos;
+as threads compartilham o mesmo MovieRecommender em memória.
+
+Endpoints:
+- GET /search?q=<título>: os 5 filmes com título mais semelhante. Pesquisas
+  que chegam juntas são agrupadas em lotes e resolvidas com search_many.
+- GET /similar/{movieId}: os 10 filmes recomendados para o filme. Pedidos
+  simultâneos para o mesmo filme compartilham um único cálculo.
+
+Os dois endpoints aceitam o filtro genres=<gêneros separados por |> e
+match_all=1 (exige todos os gêneros em vez de qualquer um deles).
+- GET /health: estado do serviço e estatísticas dos caches.
+
+Quando há mais de max_pending requisições em andamento, novas requisições
+recebem 503 (Service Unavailable) com o cabeçalho Retry-After, em vez de
+se acumularem na fila.
+
+Exemplo de Uso:
+---------------
+python recommendation_service.py --port 8080 --workers 4
+curl "http://127.0.0.1:8080/search?q=Toy%20Story"
+curl "http://127.0.0.1:8080/similar/1"
+
+A carga pode ser medida com load_test.py.
+
+Dependências:
+- aiohttp
+- movie_recommendations
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from aiohttp import web
+
+import movie_recommendations
+
+# Número máximo de requisições em andamento antes de responder 503
+MAX_PENDING = 256
+
+# Número máximo de pesquisas por lote e tempo de espera para formar um lote (segundos)
+MAX_BATCH = 64
+BATCH_WINDOW = 0.002
+
+# Número de resultados de /search (o mesmo de movie_recommendations.search)
+SEARCH_RESULTS = 5
+
+def json_response(frame, columns):
+    """
+    Converte um DataFrame de resultados em uma resposta JSON (lista de registros).
+
+    Args:
+        frame (pd.DataFrame): Os resultados.
+        columns (list): As colunas incluídas na resposta.
+
+    Returns:
+        web.Response: A resposta HTTP.
+    """
+    body = frame[columns].to_json(orient="records") if not frame.empty else "[]"
+    return web.Response(text=body, content_type="application/json")
+
+def genre_filter(request):
+    """
+    Lê o filtro de gêneros de uma requisição.
+
+    Args:
+        request (web.Request): A requisição.
+
+    Returns:
+        tuple: (gêneros normalizados ou None, match_all).
+    """
+    genres = movie_recommendations.parse_genres(request.query.get("genres"))
+    match_all = request.query.get("match_all", "").lower() in ("1", "true", "yes")
+    return genres, match_all and genres is not None
+
+def error_response(status, message, headers=None):
+    """
+    Monta uma resposta de erro em JSON.
+
+    Args:
+        status (int): O código HTTP.
+        message (str): A descrição do erro.
+        headers (dict): Cabeçalhos adicionais.
+
+    Returns:
+        web.Response: A resposta HTTP.
+    """
+    return web.json_response({"error": message}, status=status, headers=headers)
+
+class SearchBatcher:
+    """
+    Agrupa pesquisas simultâneas em lotes resolvidos por search_many.
+
+    Um lote é enviado ao pool quando atinge max_batch títulos ou quando
+    batch_window segundos se passam desde a primeira pesquisa pendente.
+
+    Args:
+        recommender (MovieRecommender): O recomendador.
+        executor (ThreadPoolExecutor): O pool onde os lotes são calculados.
+        max_batch (int): Número máximo de títulos por lote.
+        batch_window (float): Tempo máximo de espera para formar um lote, em segundos.
+        k (int): Número de resultados por título.
+    """
+
+    def __init__(self, recommender, executor, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW,
+                 k=SEARCH_RESULTS):
+        self.recommender = recommender
+        self.executor = executor
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.k = k
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+
+    async def search(self, title):
+        """
+        Pesquisa um título, aguardando o lote em que ele for incluído.
+
+        Args:
+            title (str): O título pesquisado.
+
+        Returns:
+            pd.DataFrame: Os k filmes mais semelhantes, com a coluna score.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((title, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        """Envia as pesquisas pendentes ao pool como um lote."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        """
+        Calcula um lote e entrega a cada pesquisa os seus resultados.
+
+        Args:
+            batch (list): Pares (título, future) do lote.
+        """
+        titles = list(dict.fromkeys(title for title, _ in batch))
+        self.batches += 1
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.recommender.search_many, titles, self.k)
+        except Exception as err:  # pylint: disable=broad-except
+            logging.error("Erro na pesquisa em lote: %s", err)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+        groups = dict(iter(results.groupby(level="query", sort=False))) if not results.empty \
+            else {}
+        for title, future in batch:
+            if not future.done():
+                future.set_result(groups.get(title, pd.DataFrame()))
+
+class RecommendationService:
+    """
+    Serviço HTTP assíncrono sobre um MovieRecommender.
+
+    Args:
+        recommender (MovieRecommender): O recomendador (padrão: o do módulo movie_recommendations).
+        workers (int): Número de threads do pool de cálculo (padrão: os.cpu_count()).
+        max_pending (int): Requisições em andamento a partir das quais o serviço responde 503.
+        max_batch (int): Número máximo de pesquisas por lote.
+        batch_window (float): Tempo máximo de espera para formar um lote, em segundos.
+    """
+
+    def __init__(self, recommender=None, workers=None, max_pending=MAX_PENDING,
+                 max_batch=MAX_BATCH, batch_window=BATCH_WINDOW):
+        self.recommender = recommender if recommender is not None \
+            else movie_recommendations.get_recommender()
+        self.workers = workers or os.cpu_count()
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.executor = None
+        self.batcher = None
+        self.in_flight = 0
+        self.rejected = 0
+        self._similar_in_flight = {}
+
+    def warm_up(self):
+        """Carrega os dados e constrói os índices antes de aceitar requisições."""
+        recommender = self.recommender
+        recommender.search_many([recommender.dataset.movies["title"].iloc[0]], k=1)
+        _ = recommender.ratings_matrix
+        _ = recommender.similarity_table
+        logging.info("Serviço de recomendação pronto.")
+
+    async def on_startup(self, _app):
+        """Cria o pool de threads e carrega os dados uma única vez."""
+        self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                           thread_name_prefix="recommendation")
+        self.batcher = SearchBatcher(self.recommender, self.executor,
+                                     max_batch=self.max_batch, batch_window=self.batch_window)
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.warm_up)
+
+    async def on_cleanup(self, _app):
+        """Encerra o pool de threads."""
+        self.executor.shutdown(wait=True)
+
+    @web.middleware
+    async def backpressure(self, request, handler):
+        """
+        Rejeita requisições com 503 quando há max_pending requisições em andamento.
+
+        Args:
+            request (web.Request): A requisição.
+            handler (callable): O próximo handler.
+
+        Returns:
+            web.Response: A resposta HTTP.
+        """
+        if request.path == "/health":
+            return await handler(request)
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            return error_response(503, "Serviço sobrecarregado; tente novamente.",
+                                  headers={"Retry-After": "1"})
+        self.in_flight += 1
+        try:
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    async def search(self, request):
+        """
+        GET /search?q=<título>: pesquisa filmes pelo título.
+
+        Args:
+            request (web.Request): A requisição.
+
+        Returns:
+            web.Response: Os filmes encontrados (movieId, title, genres e score).
+        """
+        title = request.query.get("q", "").strip()
+        if not movie_recommendations.clean_title(title):
+            return error_response(400, "Informe o título no parâmetro 'q'.")
+        genres, match_all = genre_filter(request)
+        try:
+            if genres is None:
+                results = await self.batcher.search(title)
+            else:
+                # Pesquisas filtradas não entram nos lotes, que são calculados sem filtro
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.recommender.search_many, [title], SEARCH_RESULTS,
+                    genres, match_all)
+        except ValueError as err:
+            return error_response(400, str(err))
+        return json_response(results, ["movieId", "title", "genres", "score"])
+
+    async def similar(self, request):
+        """
+        GET /similar/{movieId}: recomenda filmes similares.
+
+        Args:
+            request (web.Request): A requisição.
+
+        Returns:
+            web.Response: Os filmes recomendados (score, title e genres).
+        """
+        try:
+            movie_id = int(request.match_info["movie_id"])
+        except ValueError:
+            return error_response(400, "movieId deve ser um número inteiro.")
+
+        genres, match_all = genre_filter(request)
+
+        # Pedidos simultâneos para o mesmo filme e filtro aguardam o mesmo cálculo
+        key = (movie_id, genres, match_all)
+        future = self._similar_in_flight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, self.recommender.find_similar_movies, movie_id, genres, match_all)
+            self._similar_in_flight[key] = future
+            future.add_done_callback(lambda _: self._similar_in_flight.pop(key, None))
+        try:
+            results = await asyncio.shield(future)
+        except ValueError as err:
+            return error_response(400, str(err))
+        return json_response(results, ["score", "title", "genres"])
+
+    async def health(self, _request):
+        """
+        GET /health: estado do serviço.
+
+        Returns:
+            web.Response: Requisições em andamento, rejeitadas, lotes e estatísticas dos caches.
+        """
+        return web.json_response({
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "batches": self.batcher.batches if self.batcher is not None else 0,
+            "caches": self.recommender.cache_stats(),
+        })
+
+    def create_app(self):
+        """
+        Cria a aplicação aiohttp com as rotas e o controle de carga.
+
+        Returns:
+            web.Application: A aplicação.
+        """
+        app = web.Application(middlewares=[self.backpressure])
+        app.router.add_get("/search", self.search)
+        app.router.add_get("/similar/{movie_id}", self.similar)
+        app.router.add_get("/health", self.health)
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+def create_app(recommender=None, **options):
+    """
+    Cria a aplicação aiohttp do serviço de recomendação.
+
+    Args:
+        recommender (MovieRecommender): O recomendador (padrão: o do módulo movie_recommendations).
+        **options: Demais argumentos de RecommendationService.
+
+    Returns:
+        web.Application: A aplicação.
+    """
+    return RecommendationService(recommender, **options).create_app()
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando: inicia o servidor HTTP.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Serviço HTTP de recomendação de filmes.")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta.")
+    parser.add_argument("--port", type=int, default=8080, help="Porta de escuta.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de threads de cálculo (padrão: número de CPUs).")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING,
+                        help="Requisições em andamento a partir das quais o serviço responde 503.")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH,
+                        help="Número máximo de pesquisas por lote.")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000,
+                        help="Tempo máximo de espera para formar um lote, em milissegundos.")
+    args = parser.parse_args(argv)
+
+    movie_recommendations.configure_logging(movie_recommendations.LOG_FILE)
+    app = create_app(workers=args.workers, max_pending=args.max_pending,
+                     max_batch=args.max_batch, batch_window=args.batch_window_ms / 1000)
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Gerador de Dados Sintéticos no Formato MovieLens
+
+Este módulo gera filmes e avaliações sintéticos com a mesma estrutura do
+MovieLens 25M (ml-25m/movies.csv e ml-25m/ratings.csv), em qualquer escala,
+para testes e benchmarks sem baixar o conjunto de dados real.
+
+As distribuições imitam as do conjunto real:
+- A popularidade dos filmes segue uma lei de potência (Zipf): poucos filmes
+  concentram a maior parte das avaliações.
+- A atividade dos usuários é log-normal: a maioria avalia poucos filmes e
+  alguns avaliam milhares.
+- Cada filme tem uma qualidade própria; as notas vão de 0.5 a 5.0, em meias
+  estrelas, concentradas entre 3 e 4.
+- Cada par usuário/filme aparece no máximo uma vez.
+
+Exemplo de Uso:
+---------------
+from synthetic_movielens import write_movielens
+
+# 1 milhão de avaliações em ./synthetic_data/ml-25m/, mais o ZIP esperado por
+# movie_recommendations (movielens_data.zip)
+write_movielens("./synthetic_data", n_ratings=1_000_000)
+
+# Ou, pela linha de comando:
+#   python synthetic_movielens.py ./synthetic_data --ratings 1000000
+"""
+
+import argparse
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# Gêneros do MovieLens 25M
+GENRES = ["Action", "Adventure", "Animation", "Children", "Comedy", "Crime", "Documentary",
+          "Drama", "Fantasy", "Film-Noir", "Horror", "IMAX", "Musical", "Mystery", "Romance",
+          "Sci-Fi", "Thriller", "War", "Western"]
+
+# Vocabulário dos títulos sintéticos
+TITLE_WORDS = ["Love", "Night", "Story", "Man", "Life", "Day", "Girl", "House", "Dead",
+               "Time", "World", "King", "Last", "Dark", "City", "Star", "Blood", "Heart",
+               "American", "War", "Black", "Little", "Big", "Secret", "Summer", "Lost",
+               "Return", "Dream", "Wild", "Moon", "Island", "Road", "Ghost", "Christmas",
+               "Death", "Red", "Game", "Home", "Street", "Angel", "Devil", "Murder", "Fire",
+               "River", "Sun", "Shadow", "Ocean", "Rain", "Winter", "Thunder"]
+
+# Tamanho do MovieLens 25M; em outras escalas, filmes e usuários crescem com a
+# raiz quadrada do número de avaliações, mantendo a densidade da matriz (~0,25%)
+ML25M_RATINGS = 25_000_095
+ML25M_MOVIES = 62_423
+ML25M_USERS = 162_541
+
+# Expoente da lei de potência da popularidade dos filmes
+POPULARITY_EXPONENT = 1.0
+
+def generate_movies(n_movies, rng):
+    """
+    Gera o DataFrame de filmes (movieId, title, genres).
+
+    Os movieIds são crescentes mas não contíguos, como no conjunto real.
+
+    Args:
+        n_movies (int): Número de filmes.
+        rng (np.random.Generator): O gerador de números aleatórios.
+
+    Returns:
+        pd.DataFrame: Os filmes.
+    """
+    movie_ids = np.sort(rng.choice(np.arange(1, 4 * n_movies + 1), size=n_movies, replace=False))
+    words = np.asarray(TITLE_WORDS)
+    n_words = rng.integers(1, 5, n_movies)
+    title_words = words[rng.integers(0, len(TITLE_WORDS), (n_movies, 4))]
+    years = rng.integers(1920, 2020, n_movies)
+    titles = [f"{' '.join(row[:count])} ({year})"
+              for row, count, year in zip(title_words, n_words, years)]
+
+    genre_count = rng.integers(1, 4, n_movies)
+    genre_choice = rng.integers(0, len(GENRES), (n_movies, 3))
+    genres = ["|".join(dict.fromkeys(GENRES[index] for index in row[:count]))
+              for row, count in zip(genre_choice, genre_count)]
+    return pd.DataFrame({"movieId": movie_ids, "title": titles, "genres": genres})
+
+def generate_ratings(movie_ids, n_ratings, n_users, rng):
+    """
+    Gera o DataFrame de avaliações (userId, movieId, rating, timestamp).
+
+    Args:
+        movie_ids (np.ndarray): Os IDs dos filmes.
+        n_ratings (int): Número de avaliações.
+        n_users (int): Número de usuários.
+        rng (np.random.Generator): O gerador de números aleatórios.
+
+    Returns:
+        pd.DataFrame: As avaliações, ordenadas por usuário e timestamp.
+    """
+    n_movies = movie_ids.shape[0]
+    popularity = 1 / np.arange(1, n_movies + 1) ** POPULARITY_EXPONENT
+    popularity = rng.permutation(popularity / popularity.sum())
+    activity = rng.lognormal(0, 1.2, n_users)
+    activity /= activity.sum()
+    quality = rng.normal(3.5, 0.5, n_movies)
+
+    # Pares repetidos são descartados; sorteia de novo até atingir n_ratings
+    # (a cada rodada, o sorteio é ampliado pela fração de pares novos da rodada anterior)
+    pairs = np.empty(0, dtype=np.int64)
+    keep_rate = 1.0
+    while pairs.shape[0] < n_ratings:
+        size = int((n_ratings - pairs.shape[0]) / keep_rate * 1.1) + 16
+        users = rng.choice(n_users, size=size, p=activity).astype(np.int64)
+        movies = rng.choice(n_movies, size=size, p=popularity).astype(np.int64)
+        found = pairs.shape[0]
+        pairs = np.unique(np.concatenate([pairs, users << 32 | movies]))
+        keep_rate = max((pairs.shape[0] - found) / size, 0.01)
+    pairs = rng.permutation(pairs)[:n_ratings]
+    users, movies = pairs >> 32, pairs & 0xFFFFFFFF
+
+    ratings = np.clip(np.round((quality[movies] + rng.normal(0, 0.9, n_ratings)) * 2) / 2,
+                      0.5, 5.0)
+    timestamps = rng.integers(789_652_009, 1_574_327_703, n_ratings)
+    frame = pd.DataFrame({"userId": (users + 1).astype(np.int32),
+                          "movieId": movie_ids[movies].astype(np.int32),
+                          "rating": ratings, "timestamp": timestamps})
+    return frame.sort_values(["userId", "timestamp"], ignore_index=True)
+
+def generate_movielens(n_ratings=100_000, n_movies=None, n_users=None, seed=0):
+    """
+    Gera filmes e avaliações sintéticos.
+
+    Args:
+        n_ratings (int): Número de avaliações (por exemplo, de 100 mil a 25 milhões).
+        n_movies (int): Número de filmes (padrão: escalado a partir do ml-25m).
+        n_users (int): Número de usuários (padrão: escalado a partir do ml-25m).
+        seed (int): Semente do gerador.
+
+    Returns:
+        dict: DataFrames "movies" e "ratings".
+    """
+    rng = np.random.default_rng(seed)
+    scale = np.sqrt(n_ratings / ML25M_RATINGS)
+    n_movies = n_movies or max(100, int(ML25M_MOVIES * scale))
+    n_users = n_users or max(100, int(ML25M_USERS * scale))
+    if n_ratings > n_movies * n_users // 2:
+        raise ValueError("n_ratings deve ser no máximo metade dos pares usuário/filme possíveis.")
+    movies = generate_movies(n_movies, rng)
+    ratings = generate_ratings(movies["movieId"].to_numpy(), n_ratings, n_users, rng)
+    return {"movies": movies, "ratings": ratings}
+
+def write_movielens(output_directory, n_ratings=100_000, n_movies=None, n_users=None, seed=0,
+                    write_zip=True):
+    """
+    Grava os dados sintéticos no layout usado por movie_recommendations.
+
+    Os CSVs são gravados em output_directory/ml-25m/ e, com write_zip=True,
+    também em output_directory/movielens_data.zip, de modo que nenhum
+    download é feito.
+
+    Args:
+        output_directory (str): O diretório de saída.
+        n_ratings (int): Número de avaliações.
+        n_movies (int): Número de filmes (padrão: escalado a partir do ml-25m).
+        n_users (int): Número de usuários (padrão: escalado a partir do ml-25m).
+        seed (int): Semente do gerador.
+        write_zip (bool): Se True, grava também o arquivo ZIP.
+
+    Returns:
+        dict: DataFrames "movies" e "ratings" gravados.
+    """
+    data = generate_movielens(n_ratings, n_movies=n_movies, n_users=n_users, seed=seed)
+    csv_directory = os.path.join(output_directory, "ml-25m")
+    os.makedirs(csv_directory, exist_ok=True)
+    for name, frame in data.items():
+        frame.to_csv(os.path.join(csv_directory, f"{name}.csv"), index=False)
+    if write_zip:
+        with zipfile.ZipFile(os.path.join(output_directory, "movielens_data.zip"), "w",
+                             compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+            for name in data:
+                zip_file.write(os.path.join(csv_directory, f"{name}.csv"), f"ml-25m/{name}.csv")
+    return data
+
+def main(argv=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Args:
+        argv (list): Argumentos da linha de comando (padrão: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no formato MovieLens.")
+    parser.add_argument("output_directory", help="Diretório de saída.")
+    parser.add_argument("--ratings", type=int, default=100_000, help="Número de avaliações.")
+    parser.add_argument("--movies", type=int, default=None, help="Número de filmes.")
+    parser.add_argument("--users", type=int, default=None, help="Número de usuários.")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador.")
+    parser.add_argument("--no-zip", action="store_true", help="Não grava o arquivo ZIP.")
+    args = parser.parse_args(argv)
+    write_movielens(args.output_directory, n_ratings=args.ratings, n_movies=args.movies,
+                    n_users=args.users, seed=args.seed, write_zip=not args.no_zip)
+
+if __name__ == "__main__":
+    main()
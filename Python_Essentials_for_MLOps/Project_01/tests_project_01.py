@@ -1,8 +1,17 @@
+import asyncio
 import os
+import hashlib
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 import zipfile
 from unittest import mock
-from movie_recommendations_reafctored import clean_title, create_output_directory, download_zip, extract_csv_files, load_data
+import numpy as np
+import pandas as pd
+from synthetic_movielens import write_movielens
+from movie_recommendations import clean_title, create_output_directory, download_zip, extract_csv_files, load_data, TitleIndex, RatingsMatrix, similar_movie_scores_pandas, SimilarityTable, precompute_similar_movies, load_ratings, ratings_cache_is_fresh, ratings_cache_directory, TypeaheadIndex, TypeaheadSession, ResultCache, MovieLensDataset, MovieRecommender, GenreIndex
 
 # Função para criar um diretório temporário para testes
 @pytest.fixture
@@ -26,21 +35,67 @@ def test_create_output_directory(temp_directory):
     # Verifica se o diretório já existe
     assert create_output_directory(output_directory) == True
 
+# Servidor HTTP local que simula o servidor do MovieLens (com suporte a Range)
+class ZipRequestHandler(BaseHTTPRequestHandler):
+    payload = os.urandom(300_000)
+    truncate_first = False
+    requests_seen = []
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        type(self).requests_seen.append(range_header)
+        start = int(range_header[len("bytes="):-1]) if range_header else 0
+        body = self.payload[start:]
+        self.send_response(206 if range_header else 200)
+        if range_header:
+            self.send_header("Content-Range", f"bytes {start}-{len(self.payload) - 1}/{len(self.payload)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if type(self).truncate_first:
+            # Simula uma conexão interrompida no meio do arquivo
+            type(self).truncate_first = False
+            body = body[:len(body) // 2]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def zip_server():
+    ZipRequestHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ZipRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/ml-25m.zip"
+    server.shutdown()
+    server.server_close()
+
 # Teste para a função download_zip
-def test_download_zip(temp_directory):
+def test_download_zip(temp_directory, zip_server):
     output_directory = temp_directory
-    zip_url = "https://example.com/test.zip"
-    
-    # Mock para simular o download
-    with mock.patch('requests.get') as mock_get:
-        mock_response = mock.Mock()
-        mock_response.content = b'Test data'
-        mock_get.return_value = mock_response
-        
-        # Verifica se o download é bem-sucedido
-        assert download_zip(zip_url, output_directory) == True
-        zip_file_path = os.path.join(output_directory, "movielens_data.zip")
-        assert os.path.exists(zip_file_path) == True
+    expected_md5 = hashlib.md5(ZipRequestHandler.payload).hexdigest()
+
+    # Verifica se o download é bem-sucedido e verificado
+    assert download_zip(zip_server, output_directory, expected_md5=expected_md5, chunk_size=4096) == True
+    zip_file_path = os.path.join(output_directory, "movielens_data.zip")
+    assert os.path.exists(zip_file_path) == True
+    with open(zip_file_path, "rb") as zip_file:
+        assert zip_file.read() == ZipRequestHandler.payload
+
+# Teste de retomada do download com HTTP Range após uma interrupção
+def test_download_zip_resumes_after_interruption(temp_directory, zip_server):
+    ZipRequestHandler.truncate_first = True
+    expected_md5 = hashlib.md5(ZipRequestHandler.payload).hexdigest()
+
+    assert download_zip(zip_server, temp_directory, expected_md5=expected_md5, chunk_size=1000) == True
+    assert ZipRequestHandler.requests_seen[0] is None
+    assert ZipRequestHandler.requests_seen[1] == f"bytes={len(ZipRequestHandler.payload) // 2}-"
+    assert not os.path.exists(os.path.join(temp_directory, "movielens_data.zip.part"))
+
+# Teste de que um arquivo com checksum inválido não é marcado como completo
+def test_download_zip_rejects_bad_checksum(temp_directory, zip_server):
+    assert download_zip(zip_server, temp_directory, expected_md5="0" * 32) == False
+    assert not os.path.exists(os.path.join(temp_directory, "movielens_data.zip"))
 
 # Teste para a função extract_csv_files
 def test_extract_csv_files(temp_directory):
@@ -54,6 +109,343 @@ def test_extract_csv_files(temp_directory):
     # Verifica se a extração é bem-sucedida
     assert extract_csv_files(output_directory) == True
 
+def write_movielens_zip(output_directory):
+    zip_file_path = os.path.join(output_directory, "movielens_data.zip")
+    with zipfile.ZipFile(zip_file_path, 'w') as zipf:
+        zipf.writestr("ml-25m/movies.csv", "movieId,title,genres\n1,Toy Story (1995),Animation\n")
+        zipf.writestr("ml-25m/ratings.csv", "userId,movieId,rating,timestamp\n1,1,5.0,0\n2,1,3.5,0\n")
+        zipf.writestr("ml-25m/genome-scores.csv", "movieId,tagId,relevance\n1,1,0.5\n")
+
+# Teste de extração seletiva apenas dos CSVs solicitados
+def test_extract_only_requested_csv_files(temp_directory):
+    write_movielens_zip(temp_directory)
+
+    assert extract_csv_files(temp_directory, ["movies.csv", "ratings.csv"]) == True
+    assert sorted(os.listdir(os.path.join(temp_directory, "ml-25m"))) == ["movies.csv", "ratings.csv"]
+    assert extract_csv_files(temp_directory, ["links.csv"]) == False
+
+# Teste de leitura dos CSVs diretamente do ZIP, sem extração
+def test_load_data_from_zip(temp_directory):
+    write_movielens_zip(temp_directory)
+
+    data = load_data(["movies.csv", "ratings.csv"], temp_directory, from_zip=True)
+    assert list(data["movies"]["title"]) == ["Toy Story (1995)"]
+    assert list(data["ratings"]["rating"]) == [5.0, 3.5]
+    assert not os.path.exists(os.path.join(temp_directory, "ml-25m"))
+
+
+# Teste para o índice TF-IDF persistido dos títulos
+def test_title_index_persisted_and_rebuilt(temp_directory):
+    movies_path = os.path.join(temp_directory, "movies.csv")
+    movies = pd.DataFrame({"movieId": [1, 2, 3],
+                           "title": ["Toy Story (1995)", "Jumanji (1995)", "Heat (1995)"]})
+    movies.to_csv(movies_path, index=False)
+    titles = movies["title"].apply(clean_title)
+    index_directory = os.path.join(temp_directory, "title_index")
+
+    index = TitleIndex(index_directory).load_or_build(titles, movies_path)
+    indices, _ = index.query(clean_title("Toy Story"), k=2)
+    assert indices[0] == 0
+
+    # Um novo índice carrega os arquivos salvos sem reajustar o vetorizador
+    with mock.patch.object(TitleIndex, "fit") as mock_fit:
+        loaded = TitleIndex(index_directory).load_or_build(titles, movies_path)
+        mock_fit.assert_not_called()
+    assert (loaded.matrix != index.matrix).nnz == 0
+    assert np.array_equal(loaded.query("Jumanji 1995", k=1)[0], [1])
+
+    # Alterar movies.csv força a reconstrução do índice
+    movies.loc[3] = [4, "Toy Soldiers (1991)"]
+    movies.to_csv(movies_path, index=False)
+    rebuilt = TitleIndex(index_directory).load_or_build(movies["title"].apply(clean_title), movies_path)
+    assert rebuilt.matrix.shape[0] == 4
+
+# Teste de equivalência entre a matriz esparsa e a implementação com pandas
+def assert_matches_pandas_scores(sparse_scores, pandas_scores, ratings):
+    # "similar" é idêntico; "all" usa o denominador global, então os scores
+    # diferem da referência por um fator constante e a ordenação é a mesma
+    assert set(sparse_scores.index) == set(pandas_scores.index)
+    pandas_scores = pandas_scores.loc[sparse_scores.index]
+    assert np.allclose(sparse_scores["similar"], pandas_scores["similar"])
+    liked_users = ratings.loc[ratings["rating"] > 4, "userId"].nunique()
+    liked_counts = ratings[ratings["rating"] > 4]["movieId"].value_counts()
+    assert np.allclose(sparse_scores["all"], liked_counts.loc[sparse_scores.index] / liked_users)
+    ratio = sparse_scores["score"] / pandas_scores["score"]
+    assert np.allclose(ratio, ratio.iloc[0])
+
+def test_ratings_matrix_matches_pandas_scores():
+    rng = np.random.default_rng(42)
+    ratings = pd.DataFrame({"userId": rng.integers(1, 200, 5000),
+                            "movieId": rng.integers(1, 60, 5000),
+                            "rating": rng.integers(1, 11, 5000) / 2})
+    ratings = ratings.drop_duplicates(["userId", "movieId"])
+    matrix = RatingsMatrix(ratings)
+
+    assert matrix.liked_user_count == ratings.loc[ratings["rating"] > 4, "userId"].nunique()
+    for movie_id in [1, 7, 42]:
+        assert_matches_pandas_scores(matrix.similar_scores(movie_id),
+                                     similar_movie_scores_pandas(ratings, movie_id), ratings)
+
+    # Filme sem avaliações altas não gera candidatos
+    assert matrix.similar_scores(10_000).empty
+
+# Teste para a ingestão incremental de avaliações
+def test_ratings_matrix_add_ratings_matches_rebuild():
+    rng = np.random.default_rng(7)
+    ratings = pd.DataFrame({"userId": rng.integers(1, 200, 6000),
+                            "movieId": rng.integers(1, 60, 6000),
+                            "rating": rng.integers(1, 11, 6000) / 2})
+    ratings = ratings.drop_duplicates(["userId", "movieId"]).reset_index(drop=True)
+    # O último lote traz usuários e filmes que ainda não existem na matriz
+    new_ids = pd.DataFrame({"userId": [500, 500, 3], "movieId": [7, 80, 80],
+                            "rating": [5.0, 4.5, 5.0]})
+    ratings = pd.concat([ratings, new_ids], ignore_index=True)
+
+    matrix = RatingsMatrix(ratings.iloc[:4000], compact_threshold=10_000)
+    for start in range(4000, len(ratings), 500):
+        matrix.add_ratings(ratings.iloc[start:start + 500])
+    assert matrix.added_by_user.nnz > 0
+
+    full = RatingsMatrix(ratings)
+    assert matrix.nnz == full.nnz
+    assert matrix.liked_user_count == full.liked_user_count
+    for movie_id in [1, 7, 42, 80]:
+        assert np.allclose(matrix.similar_scores(movie_id).values,
+                           full.similar_scores(movie_id).values)
+        assert_matches_pandas_scores(matrix.similar_scores(movie_id),
+                                     similar_movie_scores_pandas(ratings, movie_id), ratings)
+
+    # Curtidas repetidas não são contadas de novo; compact funde os acréscimos
+    added_users, _ = matrix.add_ratings(ratings.iloc[-3:])
+    assert added_users.shape[0] == 0
+    matrix.compact()
+    assert matrix.added_by_user.nnz == 0 and matrix.nnz == full.nnz
+    assert np.allclose(matrix.similar_scores(7).values, full.similar_scores(7).values)
+
+# Teste para a invalidação seletiva do cache após add_ratings
+def test_add_ratings_invalidates_only_affected_results(temp_directory):
+    movies = pd.DataFrame({"movieId": [1, 2, 3, 4, 5],
+                           "title": ["A (1)", "B (2)", "C (3)", "D (4)", "E (5)"],
+                           "genres": ["Drama"] * 5})
+    ratings = pd.DataFrame({"userId": [1, 1, 2, 2, 3, 3, 4],
+                            "movieId": [1, 2, 1, 2, 3, 4, 5],
+                            "rating": [5.0, 5.0, 5.0, 4.5, 5.0, 5.0, 5.0]})
+    dataset = MovieLensDataset(output_directory=temp_directory)
+    dataset._frames = {"movies": movies, "ratings": ratings}  # pylint: disable=protected-access
+    recommender = MovieRecommender(dataset)
+
+    assert list(recommender.find_similar_movies(1)["title"]) == ["A (1)", "B (2)"]
+    recommender.find_similar_movies(3)
+
+    # O usuário 4 curte apenas o filme 1 (a nota 1.0 não conta): o resultado
+    # de 1 é invalidado e o de 3, sem relação com o filme 1, continua em cache
+    assert recommender.add_ratings([{"userId": 4, "movieId": 1, "rating": 5.0},
+                                    {"userId": 4, "movieId": 3, "rating": 1.0}]) == 1
+    assert recommender.similar_cache.stats()["invalidations"] == 1
+    recommender.find_similar_movies(3)
+    assert recommender.similar_cache.stats()["hits"] == 1
+    assert len(dataset.ratings) == len(ratings) + 2
+    assert np.allclose(recommender.find_similar_movies(1)["score"].values,
+                       RatingsMatrix(dataset.ratings).similar_scores(1)["score"].head(10).values)
+
+    # Um usuário novo muda o denominador global e invalida o cache inteiro
+    recommender.add_ratings([{"userId": 9, "movieId": 5, "rating": 5.0}])
+    assert len(recommender.similar_cache) == 0
+
+# Teste para a tabela pré-calculada de recomendações
+def test_precomputed_similarity_table(temp_directory):
+    rng = np.random.default_rng(7)
+    ratings = pd.DataFrame({"userId": rng.integers(1, 100, 3000),
+                            "movieId": rng.integers(1, 40, 3000),
+                            "rating": rng.integers(1, 11, 3000) / 2})
+    matrix = RatingsMatrix(ratings.drop_duplicates(["userId", "movieId"]))
+
+    table = precompute_similar_movies(matrix, range(1, 40), k=5, workers=2, chunk_size=8)
+    table.save(temp_directory)
+    loaded = SimilarityTable.load(temp_directory)
+
+    expected = matrix.similar_scores(3)["score"].head(5)
+    assert np.allclose(loaded.lookup(3).to_numpy(), expected.to_numpy())
+    # Os scores acompanham o denominador global atual
+    assert np.allclose(loaded.lookup(3, 2 * matrix.liked_user_count).to_numpy(),
+                       2 * expected.to_numpy())
+    # Filmes ausentes da tabela devem cair no cálculo ao vivo
+    assert loaded.lookup(1000) is None
+
+# Teste para o cache colunar de avaliações
+def test_ratings_cache_roundtrip(temp_directory):
+    csv_path = os.path.join(temp_directory, "ratings.csv")
+    ratings = pd.DataFrame({"userId": [1, 1, 2], "movieId": [10, 20, 10],
+                            "rating": [4.5, 3.0, 0.5], "timestamp": [1, 2, 3]})
+    ratings.to_csv(csv_path, index=False)
+    cache_directory = ratings_cache_directory(temp_directory)
+
+    loaded = load_ratings(csv_path, temp_directory)
+    assert ratings_cache_is_fresh(cache_directory, csv_path)
+    assert loaded["userId"].dtype == np.int32
+    assert list(loaded["rating"]) == [4.5, 3.0, 0.5]
+    assert "timestamp" not in loaded.columns
+
+    # Alterar o CSV invalida o cache
+    ratings.loc[3] = [3, 30, 5.0, 4]
+    ratings.to_csv(csv_path, index=False)
+    assert not ratings_cache_is_fresh(cache_directory, csv_path)
+    assert len(load_ratings(csv_path, temp_directory)) == 4
+
+# Teste de que importar o módulo não baixa, cria arquivos nem carrega dados
+def test_import_has_no_side_effects(temp_directory):
+    module_directory = os.path.dirname(os.path.abspath(__file__))
+    code = ("import sys, movie_recommendations; "
+            "assert 'sklearn' not in sys.modules; "
+            "assert movie_recommendations._recommender is None")
+    subprocess.run([sys.executable, "-c", code], cwd=temp_directory, check=True,
+                   env=dict(os.environ, PYTHONPATH=module_directory))
+    assert os.listdir(temp_directory) == []
+
+# Teste da pesquisa em lote (equivalente a consultas individuais)
+def test_title_index_query_many_matches_query(temp_directory):
+    titles = [clean_title(t) for t in ["Toy Story (1995)", "Toy Story 2 (1999)", "Jumanji (1995)",
+                                       "Heat (1995)", "Sabrina (1995)", "Tom and Huck (1995)"]]
+    index = TitleIndex(os.path.join(temp_directory, "title_index")).fit(titles)
+    queries = ["Toy Story", "jumanji", "Heat", "Huck"]
+
+    indices, similarity = index.query_many(queries, k=3, chunk_size=2)
+    assert indices.shape == (4, 3)
+    for row, query in enumerate(queries):
+        single_indices, single_similarity = index.query(query, k=3)
+        assert indices[row, 0] == single_indices[0]
+        assert np.allclose(similarity[row], single_similarity)
+    assert np.all(np.diff(similarity, axis=1) <= 0)
+
+# Teste da pesquisa incremental por prefixo
+def test_typeahead_session_narrows_candidates():
+    titles = [clean_title(t) for t in ["Toy Story (1995)", "Toy Story 2 (1999)", "Toys (1992)",
+                                       "Story of Us, The (1999)", "Heat (1995)"]]
+    index = TypeaheadIndex(titles, cache_size=2)
+    session = TypeaheadSession(index)
+
+    assert list(session.candidates("to")) == [0, 1, 2]
+    assert list(session.candidates("toy st")) == [0, 1]
+    assert list(session.candidates("Toy Story 2")) == [1]
+    # Apagar caracteres recomeça a partir do índice (e do LRU)
+    assert list(session.candidates("toy")) == [0, 1, 2]
+    assert list(session.search("toy story", k=2)) == [0, 1]
+    assert len(index._cache) <= 2
+
+# Teste do cache de resultados (tamanho, TTL e versão dos dados)
+def test_result_cache_eviction_and_invalidation():
+    now = [0.0]
+    cache = ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1, version="v1")
+    cache.set("b", 2, version="v1")
+    assert cache.get("a", "v1") == (True, 1)
+    cache.set("c", 3, version="v1")  # despeja "b", a entrada menos usada
+    assert cache.get("b", "v1") == (False, None)
+
+    # Nova versão dos dados invalida a entrada
+    assert cache.get("a", "v2") == (False, None)
+
+    now[0] = 11.0  # TTL expirado
+    assert cache.get("c", "v1") == (False, None)
+    assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 2, "invalidations": 1,
+                             "size": 0, "maxsize": 2}
+
+# Teste para o gerador de dados sintéticos, usado de ponta a ponta sem rede
+def test_synthetic_movielens_end_to_end(temp_directory):
+    data = write_movielens(temp_directory, n_ratings=20_000, seed=1)
+    ratings = data["ratings"]
+    assert len(ratings) == 20_000
+    assert not ratings.duplicated(["userId", "movieId"]).any()
+    assert ratings["rating"].between(0.5, 5.0).all()
+    assert set(ratings["movieId"]) <= set(data["movies"]["movieId"])
+    # Lei de potência: os 10% de filmes mais avaliados concentram a maioria das avaliações
+    counts = ratings["movieId"].value_counts()
+    assert counts.iloc[:len(counts) // 10].sum() > 0.5 * len(ratings)
+
+    recommender = MovieRecommender(MovieLensDataset(output_directory=temp_directory))
+    title = data["movies"]["title"].iloc[0]
+    assert recommender.search(title)["title"].iloc[0] == title
+    popular = int(counts.index[0])
+    assert not recommender.find_similar_movies(popular).empty
+
+# Teste para o filtro de gêneros por máscara de bits
+def test_genre_filter_keeps_top_k_full(temp_directory):
+    data = write_movielens(temp_directory, n_ratings=20_000, n_movies=100, n_users=500, seed=2)
+    movies = data["movies"]
+    index = GenreIndex(movies)
+    has_drama = movies["genres"].str.split("|").apply(lambda genres: "Drama" in genres)
+    has_both = movies["genres"].str.split("|").apply(lambda genres: {"Drama", "War"} <= set(genres))
+    assert np.array_equal(index.positions("Drama"), has_drama.to_numpy())
+    assert np.array_equal(index.positions(["War", "Drama"], match_all=True), has_both.to_numpy())
+    with pytest.raises(ValueError):
+        index.mask("Drama|Cartoon")
+
+    recommender = MovieRecommender(MovieLensDataset(output_directory=temp_directory))
+    genres = ["Drama", "Comedy", "Action", "Thriller", "Romance", "Crime"]
+    popular = int(data["ratings"]["movieId"].value_counts().index[0])
+    unfiltered = recommender.ratings_matrix.similar_scores(popular)
+    accepted = movies.loc[movies["genres"].str.contains("|".join(genres)), "movieId"]
+    expected = unfiltered[unfiltered.index.isin(accepted)]["score"].head(10)
+    assert len(expected) == 10 and len(unfiltered.head(10).index.intersection(accepted)) < 10
+
+    # O filtro é aplicado antes do top-k: os 10 resultados são todos dos gêneros pedidos
+    results = recommender.find_similar_movies(popular, genres=genres)
+    assert len(results) == 10
+    assert results["genres"].str.contains("|".join(genres)).all()
+    assert np.allclose(results["score"].to_numpy(), expected.to_numpy())
+
+    results = recommender.search(movies["title"].iloc[0], genres="Drama")
+    assert len(results) == 5 and results["genres"].str.contains("Drama").all()
+
+# Teste para o serviço HTTP assíncrono
+def test_recommendation_service_endpoints_and_backpressure(temp_directory):
+    pytest.importorskip("aiohttp")
+    from aiohttp.test_utils import TestClient, TestServer  # pylint: disable=import-outside-toplevel
+    from recommendation_service import RecommendationService  # pylint: disable=import-outside-toplevel
+
+    movies = pd.DataFrame({"movieId": [1, 2, 3], "title": ["Toy Story (1995)", "Heat (1995)",
+                                                           "Toy Soldiers (1991)"],
+                           "genres": ["Animation", "Action", "Action"]})
+    movies["clean_title"] = movies["title"].apply(clean_title)
+    ratings = pd.DataFrame({"userId": [1, 1, 2, 2, 3], "movieId": [1, 2, 1, 2, 3],
+                            "rating": [5.0, 5.0, 5.0, 4.5, 5.0]})
+    dataset = MovieLensDataset(output_directory=temp_directory)
+    dataset._frames = {"movies": movies, "ratings": ratings}  # pylint: disable=protected-access
+    service = RecommendationService(MovieRecommender(dataset), workers=2, max_pending=1)
+
+    async def scenario():
+        async with TestClient(TestServer(service.create_app())) as client:
+            response = await client.get("/search", params={"q": "toy story"})
+            assert response.status == 200
+            assert (await response.json())[0]["movieId"] == 1
+
+            response = await client.get("/similar/1")
+            assert [movie["title"] for movie in await response.json()] == \
+                ["Toy Story (1995)", "Heat (1995)"]
+            assert (await client.get("/similar/abc")).status == 400
+            response = await client.get("/similar/1", params={"genres": "Action"})
+            assert [movie["title"] for movie in await response.json()] == ["Heat (1995)"]
+            response = await client.get("/search", params={"q": "toy", "genres": "Action"})
+            assert [movie["movieId"] for movie in await response.json()] == [2, 3][::-1] or \
+                all(movie["genres"] == "Action" for movie in await response.json())
+            assert (await client.get("/similar/1", params={"genres": "Cartoon"})).status == 400
+            assert (await client.get("/search")).status == 400
+
+            # Com max_pending=1, uma segunda requisição simultânea recebe 503
+            release = threading.Event()
+            original = service.recommender.find_similar_movies
+            service.recommender.find_similar_movies = lambda movie_id: (release.wait(5),
+                                                                        original(movie_id))[1]
+            slow = asyncio.ensure_future(client.get("/similar/2"))
+            while service.in_flight == 0:
+                await asyncio.sleep(0.01)
+            response = await client.get("/similar/3")
+            assert response.status == 503 and response.headers["Retry-After"] == "1"
+            release.set()
+            assert (await slow).status == 200
+
+    asyncio.run(scenario())
 
 
 if __name__ == '__main__':